@@ -7,56 +7,262 @@ Run these periodically to:
 - Update calendar status
 """
 
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from .reminder_service import process_calendar_reminders
+from .reminder_service import process_reminders_for_calendar, REMINDER_COUNT_KEYS
 from .scheduler import auto_reschedule_calendar
-from ..db.calendar_db_service import get_active_calendars, update_calendar
+from .weather_service import get_weather_forecast, weather_cell
+from ..db.calendar_db_service import iter_active_calendars, shard_id_range, update_calendar
+from ..db.job_checkpoint_service import get_checkpoint, save_checkpoint
 
+# Weather prefetch: one forecast per grid cell, fetched concurrently but
+# kept under the WeatherAPI request rate
+WEATHER_PREFETCH_WORKERS = int(os.getenv("WEATHER_PREFETCH_WORKERS", "4"))
+WEATHER_PREFETCH_RATE_PER_S = float(os.getenv("WEATHER_PREFETCH_RATE_PER_S", "5"))
 
-def process_all_active_calendars():
+# Calendar processing pool
+CALENDAR_JOB_WORKERS = int(os.getenv("CALENDAR_JOB_WORKERS", "8"))
+# A calendar running longer than this is reported as timed out and no
+# longer waited on (its thread finishes in the background)
+CALENDAR_JOB_TIMEOUT_S = float(os.getenv("CALENDAR_JOB_TIMEOUT_S", "120"))
+PROGRESS_INTERVAL_S = 30
+
+# Calendars are read in pages and split into shards by document id, so
+# several scheduler processes can each own one shard. Progress is
+# checkpointed after every page.
+CALENDAR_JOB_PAGE_SIZE = int(os.getenv("CALENDAR_JOB_PAGE_SIZE", "200"))
+CALENDAR_JOB_SHARD_INDEX = int(os.getenv("CALENDAR_JOB_SHARD_INDEX", "0"))
+CALENDAR_JOB_SHARD_COUNT = int(os.getenv("CALENDAR_JOB_SHARD_COUNT", "1"))
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate_per_s: float):
+        self._interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _calendar_cell(calendar: dict):
+    location = calendar.get("location") or {}
+    if location.get("lat") is None or location.get("lng") is None:
+        return None
+    return weather_cell(location["lat"], location["lng"])
+
+
+def prefetch_forecasts(calendars: list, known: dict = None) -> dict:
+    """
+    Fetch the 7-day forecast once per distinct location cell.
+    
+    Args:
+        calendars: Active calendars
+        known: Already fetched forecasts; their cells are skipped
+    
+    Returns:
+        Dict of cell -> forecast (None where the fetch failed)
+    """
+    known = known or {}
+    cells = {cell for cell in map(_calendar_cell, calendars) if cell is not None and cell not in known}
+    if not cells:
+        return {}
+
+    limiter = _RateLimiter(WEATHER_PREFETCH_RATE_PER_S)
+
+    def fetch(cell):
+        limiter.wait()
+        return get_weather_forecast(cell[0], cell[1], days=7)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WEATHER_PREFETCH_WORKERS) as pool:
+        forecasts = dict(zip(cells, pool.map(fetch, cells)))
+
+    failed = sum(1 for f in forecasts.values() if not f)
+    print(f"Prefetched weather for {len(cells)} location cell(s) "
+          f"({failed} failed) in {time.perf_counter() - started:.1f}s")
+    return forecasts
+
+
+def process_calendar(calendar: dict, forecast: dict = None) -> dict:
+    """
+    Reschedule one calendar against the weather and send its reminders.
+    
+    Args:
+        calendar: Calendar dict
+        forecast: Pre-fetched 7-day forecast (optional)
+    
+    Returns:
+        Dict with rescheduled activity count and reminder counts
+    """
+    calendar_id = calendar["calendarId"]
+    
+    # 1. Check weather and reschedule
+    updated_calendar, evaluation = auto_reschedule_calendar(calendar, forecast)
+    rescheduled = 0
+    if evaluation["needsRescheduling"]:
+        rescheduled = len(evaluation["recommendations"])
+        update_calendar(calendar_id, updated_calendar)
+    
+    # 2. Process reminders on the in-memory (possibly rescheduled) calendar
+    updated_calendar["calendarId"] = calendar_id
+    reminder_result = process_reminders_for_calendar(updated_calendar)
+    
+    result = {"rescheduled": rescheduled}
+    for key in REMINDER_COUNT_KEYS:
+        result[key] = reminder_result.get(key, 0)
+    return result
+
+
+def _process_calendars(calendars: list, forecasts: dict) -> dict:
+    """
+    Run process_calendar over all calendars on a worker pool.
+    Failures and timeouts are counted per calendar and never stop the run.
     """
-    Process all active calendars:
+    total = len(calendars)
+    counts = {"total": total, "ok": 0, "errors": 0, "timeouts": 0, "rescheduled": 0}
+    counts.update({key: 0 for key in REMINDER_COUNT_KEYS})
+    if not total:
+        return counts
+
+    started_at = {}
+
+    def run(calendar):
+        started_at[calendar["calendarId"]] = time.monotonic()
+        return process_calendar(calendar, forecasts.get(_calendar_cell(calendar)))
+
+    job_started = time.monotonic()
+    last_report = job_started
+    pool = ThreadPoolExecutor(max_workers=CALENDAR_JOB_WORKERS, thread_name_prefix="calendar-job")
+    try:
+        pending = {pool.submit(run, calendar): calendar for calendar in calendars}
+        while pending:
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                calendar = pending.pop(future)
+                try:
+                    result = future.result()
+                    counts["ok"] += 1
+                    for key, value in result.items():
+                        counts[key] += value
+                except Exception as e:
+                    counts["errors"] += 1
+                    print(f"   Error processing calendar {calendar['calendarId']}: {e}")
+
+            now = time.monotonic()
+            for future, calendar in list(pending.items()):
+                began = started_at.get(calendar["calendarId"])
+                if began is not None and now - began > CALENDAR_JOB_TIMEOUT_S:
+                    pending.pop(future)
+                    counts["timeouts"] += 1
+                    print(f"   Calendar {calendar['calendarId']} timed out after {CALENDAR_JOB_TIMEOUT_S}s")
+
+            if now - last_report >= PROGRESS_INTERVAL_S or not pending:
+                finished = total - len(pending)
+                rate = finished / max(now - job_started, 1e-6)
+                print(f"Progress: {finished}/{total} calendars "
+                      f"(ok {counts['ok']}, errors {counts['errors']}, timeouts {counts['timeouts']}) "
+                      f"{rate:.1f}/s")
+                last_report = now
+    finally:
+        # Don't block on timed-out calendars still running
+        pool.shutdown(wait=False)
+
+    return counts
+
+
+def _merge_counts(total: dict, page: dict):
+    for key, value in page.items():
+        total[key] = total.get(key, 0) + value
+
+
+def _resumable(checkpoint: dict) -> bool:
+    """True if the checkpoint is an interrupted run started today (UTC)."""
+    if checkpoint.get("status") != "running" or not checkpoint.get("lastCalendarId"):
+        return False
+    started_at = checkpoint.get("startedAt") or ""
+    return started_at[:10] == datetime.utcnow().strftime("%Y-%m-%d")
+
+
+def process_all_active_calendars(shard_index: int = None, shard_count: int = None):
+    """
+    Process all active calendars in one shard:
     - Check weather
     - Reschedule if needed
     - Send reminders
+    
+    A run interrupted earlier the same UTC day resumes after the last
+    checkpointed calendar; older interrupted runs are restarted, since
+    reminders are only sent on the day they are due.
+    
+    Args:
+        shard_index: Shard owned by this process (default CALENDAR_JOB_SHARD_INDEX)
+        shard_count: Total shards (default CALENDAR_JOB_SHARD_COUNT)
+    
+    Returns:
+        Aggregated counts for the run
     """
+    shard_index = CALENDAR_JOB_SHARD_INDEX if shard_index is None else shard_index
+    shard_count = CALENDAR_JOB_SHARD_COUNT if shard_count is None else shard_count
+    checkpoint_name = f"calendar_job_shard_{shard_index}_of_{shard_count}"
+    
     print("\n" + "=" * 80)
     print(f"BACKGROUND JOB STARTED: {datetime.now().isoformat()}")
+    print(f"   Shard {shard_index + 1}/{shard_count}")
     print("=" * 80)
     
-    calendars = get_active_calendars()
-    print(f"\nFound {len(calendars)} active calendar(s)")
-    
-    for calendar in calendars:
-        calendar_id = calendar["calendarId"]
-        user_id = calendar["userId"]
-        crop = calendar["crop"]
-        
-        print(f"\nProcessing: {crop} calendar for user {user_id}")
-        
-        try:
-            # 1. Check weather and reschedule
-            print(f"   Checking weather forecast...")
-            updated_calendar, evaluation = auto_reschedule_calendar(calendar)
-            
-            if evaluation["needsRescheduling"]:
-                print(f"   Rescheduled {len(evaluation['recommendations'])} activities")
-                update_calendar(calendar_id, updated_calendar)
-            else:
-                print(f"   No rescheduling needed")
-            
-            # 2. Process reminders
-            print(f"   Processing reminders...")
-            reminder_result = process_calendar_reminders(calendar_id)
-            print(f"   Sent {reminder_result['remindersSent']} reminders")
-        
-        except Exception as e:
-            print(f"   Error processing calendar: {e}")
+    checkpoint = get_checkpoint(checkpoint_name) or {}
+    if _resumable(checkpoint):
+        resume_after = checkpoint["lastCalendarId"]
+        summary = dict(checkpoint.get("summary") or {})
+        print(f"\nResuming interrupted run after calendar {resume_after}")
+    else:
+        resume_after = None
+        summary = {}
+        save_checkpoint(checkpoint_name, {
+            "status": "running",
+            "lastCalendarId": None,
+            "startedAt": datetime.utcnow().isoformat(),
+            "summary": summary,
+        })
+    
+    forecasts = {}
+    pages = iter_active_calendars(
+        page_size=CALENDAR_JOB_PAGE_SIZE,
+        start_after=resume_after,
+        id_range=shard_id_range(shard_index, shard_count),
+    )
+    for page in pages:
+        print(f"\nProcessing page of {len(page)} active calendar(s)")
+        forecasts.update(prefetch_forecasts(page, known=forecasts))
+        _merge_counts(summary, _process_calendars(page, forecasts))
+        save_checkpoint(checkpoint_name, {
+            "status": "running",
+            "lastCalendarId": page[-1]["calendarId"],
+            "summary": summary,
+        })
+    
+    save_checkpoint(checkpoint_name, {
+        "status": "completed",
+        "completedAt": datetime.utcnow().isoformat(),
+        "summary": summary,
+    })
     
     print("\n" + "=" * 80)
     print(f"BACKGROUND JOB COMPLETED: {datetime.now().isoformat()}")
+    print(f"   {summary}")
     print("=" * 80)
+    return summary
 
 
 def run_scheduler(interval_hours: int = 6):
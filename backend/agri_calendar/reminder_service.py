@@ -9,6 +9,13 @@ import os
 from datetime import datetime, timedelta
 from typing import List, Dict
 import logging
+
+# common/ is top-level when run from backend/ (app.py), but a sibling
+# package when loaded as backend.agri_calendar (background_jobs)
+try:
+    from common.http_client import get_client
+except ImportError:
+    from ..common.http_client import get_client
 # --- OPTIONAL GOOGLE AUTH ---
 # Force disabled due to persistent environment errors
 # try:
@@ -29,6 +36,8 @@ FIREBASE_PROJECT_ID = "krishivaidhya"
 FCM_ENDPOINT = f"https://fcm.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/messages:send"
 SERVICE_ACCOUNT_FILE = "firebase_notification.json"  # Path to your service account JSON
 
+_http = get_client("fcm")
+
 
 def get_access_token():
     """
@@ -384,7 +393,7 @@ def send_push_notification(user_id: str, reminder: dict, calendar: dict) -> bool
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(
+            response = _http.post(
                 FCM_ENDPOINT,
                 json=fcm_message,
                 headers=headers,
@@ -413,6 +422,10 @@ def send_push_notification(user_id: str, reminder: dict, calendar: dict) -> bool
         return False
 
 
+# Counters summed by process_reminders_bulk
+REMINDER_COUNT_KEYS = ("inAppSent", "inAppFailed", "pushSent", "pushFailed", "totalReminders")
+
+
 def process_calendar_reminders(calendar_id: str, enable_push: bool = True) -> dict:
     """
     Process all reminders for a calendar.
@@ -434,6 +447,22 @@ def process_calendar_reminders(calendar_id: str, enable_push: bool = True) -> di
     # Add calendar ID to calendar dict for reference
     calendar["calendarId"] = calendar_id
     
+    return process_reminders_for_calendar(calendar, enable_push)
+
+
+def process_reminders_for_calendar(calendar: dict, enable_push: bool = True) -> dict:
+    """
+    Process today's reminders for an already loaded calendar.
+    
+    Args:
+        calendar: Calendar dict (must include calendarId)
+        enable_push: Enable push notifications (default True)
+    
+    Returns:
+        Summary of reminders sent
+    """
+    calendar_id = calendar["calendarId"]
+    
     # Get today's reminders
     todays_reminders = get_todays_reminders(calendar)
     
@@ -441,7 +470,10 @@ def process_calendar_reminders(calendar_id: str, enable_push: bool = True) -> di
         return {
             "calendarId": calendar_id,
             "inAppSent": 0,
+            "inAppFailed": 0,
             "pushSent": 0,
+            "pushFailed": 0,
+            "totalReminders": 0,
             "message": "No reminders due today"
         }
     
@@ -483,6 +515,35 @@ def process_calendar_reminders(calendar_id: str, enable_push: bool = True) -> di
     }
 
 
+def process_reminders_bulk(calendars: List[Dict], enable_push: bool = True) -> dict:
+    """
+    Process today's reminders for a batch of loaded calendars.
+    
+    Args:
+        calendars: Calendar dicts (each must include calendarId)
+        enable_push: Enable push notifications (default True)
+    
+    Returns:
+        Counts summed over all calendars, plus calendars processed and errors
+    """
+    totals = {key: 0 for key in REMINDER_COUNT_KEYS}
+    totals["calendars"] = 0
+    totals["errors"] = 0
+    
+    for calendar in calendars:
+        try:
+            result = process_reminders_for_calendar(calendar, enable_push)
+        except Exception as e:
+            logger.error(f"Failed to process reminders for {calendar.get('calendarId')}: {e}")
+            totals["errors"] += 1
+            continue
+        totals["calendars"] += 1
+        for key in REMINDER_COUNT_KEYS:
+            totals[key] += result.get(key, 0)
+    
+    return totals
+
+
 def get_user_notifications(user_id: str, unread_only: bool = True, limit: int = 50) -> List[Dict]:
     """
     Get in-app notifications for a user from Firestore.
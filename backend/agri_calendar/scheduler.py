@@ -7,12 +7,13 @@ from datetime import datetime, timedelta
 from .weather_service import get_weather_forecast, analyze_weather_conditions, check_activity_feasibility
 
 
-def evaluate_calendar_for_rescheduling(calendar: dict) -> dict:
+def evaluate_calendar_for_rescheduling(calendar: dict, forecast: dict = None) -> dict:
     """
     Evaluate a calendar and determine if any activities need rescheduling.
     
     Args:
         calendar: Calendar dict
+        forecast: Pre-fetched 7-day forecast for the calendar's location (optional)
     
     Returns:
         Rescheduling recommendations
@@ -21,7 +22,8 @@ def evaluate_calendar_for_rescheduling(calendar: dict) -> dict:
     optimal_conditions = calendar["optimalConditions"]
     
     # Get 7-day weather forecast
-    forecast = get_weather_forecast(location["lat"], location["lng"], days=7)
+    if forecast is None:
+        forecast = get_weather_forecast(location["lat"], location["lng"], days=7)
     
     if not forecast:
         return {
@@ -121,18 +123,19 @@ def apply_rescheduling(calendar: dict, recommendations: list) -> dict:
     return calendar
 
 
-def auto_reschedule_calendar(calendar: dict) -> dict:
+def auto_reschedule_calendar(calendar: dict, forecast: dict = None) -> dict:
     """
     Automatically evaluate and reschedule a calendar based on weather.
     
     Args:
         calendar: Calendar dict
+        forecast: Pre-fetched 7-day forecast (optional, fetched if omitted)
     
     Returns:
         Updated calendar (if rescheduling was needed)
     """
     # Evaluate for rescheduling
-    evaluation = evaluate_calendar_for_rescheduling(calendar)
+    evaluation = evaluate_calendar_for_rescheduling(calendar, forecast)
     
     if evaluation["needsRescheduling"]:
         # Apply recommendations
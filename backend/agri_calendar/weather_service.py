@@ -3,17 +3,90 @@
 Weather API integration for intelligent calendar rescheduling.
 """
 
+import math
 import os
+import time
 import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+# common/ is top-level when run from backend/ (app.py), but a sibling
+# package when loaded as backend.agri_calendar (background_jobs)
+try:
+    from common.http_client import get_client
+    from common.ttl_cache import TTLCache
+except ImportError:
+    from ..common.http_client import get_client
+    from ..common.ttl_cache import TTLCache
+
 load_dotenv()
 
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 
 BASE_URL = "http://api.weatherapi.com/v1"
 
+_http = get_client("weather")
+
+# ---------------- FORECAST CACHE ----------------
+# Forecasts are cached per grid cell (0.05° ≈ 5.5km) and fetched for the
+# cell centre, so every point in a cell shares one upstream call. Each
+# entry holds the longest horizon fetched; shorter requests are sliced.
+WEATHER_GRID_DEG = float(os.getenv("WEATHER_CACHE_GRID_DEG", "0.05"))
+# Smallest horizon requested upstream, so 1/3/7-day callers share an entry
+WEATHER_MIN_FETCH_DAYS = int(os.getenv("WEATHER_MIN_FETCH_DAYS", "7"))
+# WeatherAPI refreshes current conditions every 15 minutes
+WEATHER_UPDATE_INTERVAL_S = int(os.getenv("WEATHER_CACHE_TTL_S", "900"))
+MAX_FORECAST_DAYS = 14
+
+_forecast_cache = TTLCache(
+    "weather_forecast",
+    maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "5000")),
+    ttl_s=WEATHER_UPDATE_INTERVAL_S,
+)
+
+
+def weather_cell(lat: float, lng: float) -> tuple:
+    """Centre of the forecast grid cell containing (lat, lng)."""
+    return (
+        round((math.floor(lat / WEATHER_GRID_DEG) + 0.5) * WEATHER_GRID_DEG, 4),
+        round((math.floor(lng / WEATHER_GRID_DEG) + 0.5) * WEATHER_GRID_DEG, 4),
+    )
+
+
+def _slice_forecast(forecast: dict, days: int) -> dict:
+    """Shallow view of a cached forecast limited to the first `days` days."""
+    forecast_days = forecast.get("forecast", {}).get("forecastday", [])
+    return {**forecast, "forecast": {**forecast.get("forecast", {}), "forecastday": forecast_days[:days]}}
+
+
+def _cache_ttl(forecast: dict) -> float:
+    """Seconds until the provider's next update after this snapshot."""
+    updated = forecast.get("current", {}).get("last_updated_epoch")
+    if not updated:
+        return WEATHER_UPDATE_INTERVAL_S
+    remaining = updated + WEATHER_UPDATE_INTERVAL_S - time.time()
+    return min(WEATHER_UPDATE_INTERVAL_S, max(60, remaining))
+
+
+def _fetch_forecast(lat: float, lng: float, days: int) -> dict:
+    url = f"{BASE_URL}/forecast.json"
+    
+    params = {
+        "key": WEATHER_API_KEY,
+        "q": f"{lat},{lng}",
+        "days": days,
+        "aqi": "no",
+        "alerts": "yes"
+    }
+    
+    try:
+        response = _http.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Weather API error: {e}")
+        return None
+
 
 def get_weather_forecast(lat: float, lng: float, days: int = 7) -> dict:
     """
@@ -25,7 +98,7 @@ def get_weather_forecast(lat: float, lng: float, days: int = 7) -> dict:
         days: Number of days to forecast (1-14)
     
     Returns:
-        Weather forecast data
+        Weather forecast data (served from the grid-cell cache when fresh)
     """
     if not WEATHER_API_KEY:
         print("Weather API Key not set. Returning mock forecast.")
@@ -49,24 +122,26 @@ def get_weather_forecast(lat: float, lng: float, days: int = 7) -> dict:
             }
         }
 
-    url = f"{BASE_URL}/forecast.json"
-    
-    params = {
-        "key": WEATHER_API_KEY,
-        "q": f"{lat},{lng}",
-        "days": min(days, 14),  # API supports up to 14 days
-        "aqi": "no",
-        "alerts": "yes"
-    }
-    
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Weather API error: {e}")
+    days = min(days, MAX_FORECAST_DAYS)  # API supports up to 14 days
+    cell = weather_cell(lat, lng)
+    cache_key = f"{cell[0]},{cell[1]}"
+
+    cached = _forecast_cache.get(cache_key)
+    if cached is not None and cached["days"] >= days:
+        return _slice_forecast(cached["forecast"], days)
+
+    fetch_days = min(MAX_FORECAST_DAYS, max(days, WEATHER_MIN_FETCH_DAYS, cached["days"] if cached else 0))
+    forecast = _fetch_forecast(cell[0], cell[1], fetch_days)
+    if forecast is None:
         return None
 
+    _forecast_cache.set(cache_key, {"days": fetch_days, "forecast": forecast}, ttl_s=_cache_ttl(forecast))
+    return _slice_forecast(forecast, days)
+
+
+def weather_cache_stats() -> dict:
+    return _forecast_cache.stats()
+
 
 def analyze_weather_conditions(forecast: dict, optimal_conditions: dict) -> list:
     """
@@ -19,6 +19,11 @@ from prediction import prediction_engine
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Load the CNN at startup instead of on the first diagnosis
+if os.getenv("MODEL_WARMUP", "0").lower() in ("1", "true", "yes"):
+    from doc_feature import model_registry
+    model_registry.warm_up()
+
 @app.route('/')
 def home():
     from db.firebase_init import FIREBASE_AVAILABLE
@@ -59,25 +64,30 @@ def diagnose_crop():
     if not user_id:
         return jsonify({"error": "User ID required"}), 400
         
-    # Save temp file
-    temp_path = f"temp_{image.filename}"
-    image.save(temp_path)
+    # Read the upload into memory; nothing is written to disk
+    image_bytes = image.read()
+    if not image_bytes:
+        return jsonify({"error": "Empty image file"}), 400
+    
+    # Async mode: answer right after the CNN, finish the rest in the background
+    async_mode = str(request.args.get('async', request.form.get('async', ''))).lower() in ('1', 'true', 'yes')
     
     try:
-        # Run AI Pipeline
-        result = pipeline.run_pipeline(temp_path, user_id, lat, lng)
+        if async_mode:
+            from doc_feature import diagnosis_jobs
+            classification = pipeline.classify_image(image_bytes, user_id, mime_type=image.mimetype)
+            try:
+                job = diagnosis_jobs.submit_job(classification, lat, lng)
+            except diagnosis_jobs.JobQueueFull as e:
+                return jsonify({"error": str(e)}), 503
+            job["pollUrl"] = f"/api/diagnosis/jobs/{job['jobId']}"
+            return jsonify(job), 202
         
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-            
+        # Run AI Pipeline
+        result = pipeline.run_pipeline(image_bytes, user_id, lat, lng, mime_type=image.mimetype)
         return jsonify(result)
         
     except ValueError as e:
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
         # Handle specific validation errors with user-friendly messages
         error_msg = str(e)
         if "Confidence too low" in error_msg or "confidence" in error_msg.lower():
@@ -90,10 +100,37 @@ def diagnose_crop():
             return jsonify({"error": error_msg}), 400
             
     except Exception as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/diagnosis/jobs/<job_id>', methods=['GET'])
+def get_diagnosis_job(job_id):
+    from doc_feature import diagnosis_jobs
+    job = diagnosis_jobs.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/diagnosis/stats', methods=['GET'])
+def get_diagnosis_stats():
+    from doc_feature import batch_infer, model_registry, result_cache, llm, agri_store_service
+    from common.http_client import http_stats
+    from agri_calendar import weather_service
+    from prediction.alert_cache import alert_cache_stats
+    stats = {
+        "store_cache": agri_store_service.store_cache_stats(),
+        "geocode_cache": location_service.geocode_cache_stats(),
+        "weather_cache": weather_service.weather_cache_stats(),
+        "alert_cache": alert_cache_stats(),
+        "http": http_stats(),
+        "model": model_registry.model_info(),
+        "result_cache": result_cache.cache_stats(),
+        "llm_cache": llm.explanation_cache_stats(),
+        "batching": batch_infer.batching_enabled(),
+    }
+    if stats["batching"] and batch_infer._engine is not None:
+        stats["inference"] = batch_infer._engine.stats()
+    return jsonify(stats)
+
 # --- CALENDAR ROUTES ---
 @app.route('/api/calendar/generate', methods=['POST'])
 def generate_calendar():
@@ -0,0 +1,159 @@
+# kvb/common/http_client.py
+"""
+Shared outbound HTTP layer.
+One keep-alive session per upstream, with its own connection pool and
+retry/backoff policy, so repeat calls skip the TCP+TLS handshake.
+Per-upstream latency and connection reuse are reported by http_stats().
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Per-upstream policy. Retries here cover transport failures and
+# transient 5xx; callers keep their own handling for 4xx/429 (e.g. the
+# Gemini model fallback chain). POST is only retried on connect errors,
+# where the request never reached the server.
+UPSTREAMS = {
+    "google_maps": {
+        "pool_connections": 4, "pool_maxsize": 16,
+        "retries": 2, "backoff_factor": 0.3,
+        "status_forcelist": (500, 502, 503, 504),
+    },
+    "weather": {
+        "pool_connections": 2, "pool_maxsize": 8,
+        "retries": 2, "backoff_factor": 0.5,
+        "status_forcelist": (500, 502, 503, 504),
+    },
+    "gemini": {
+        "pool_connections": 2, "pool_maxsize": 16,
+        "retries": 1, "backoff_factor": 0.5,
+        "status_forcelist": (),
+    },
+    "fcm": {
+        "pool_connections": 1, "pool_maxsize": 8,
+        "retries": 2, "backoff_factor": 0.5,
+        "status_forcelist": (500, 502, 503, 504),
+    },
+}
+
+_DEFAULT_POLICY = {
+    "pool_connections": 2, "pool_maxsize": 8,
+    "retries": 1, "backoff_factor": 0.5,
+    "status_forcelist": (),
+}
+
+
+def _retry(policy: dict) -> Retry:
+    return Retry(
+        total=policy["retries"],
+        connect=policy["retries"],
+        read=policy["retries"],
+        status=policy["retries"],
+        backoff_factor=policy["backoff_factor"],
+        status_forcelist=policy["status_forcelist"],
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        # Hand the final response back so callers' raise_for_status() still applies
+        raise_on_status=False,
+    )
+
+
+class UpstreamClient:
+    """
+    Thin wrapper over a requests.Session for a single upstream.
+
+    Exposes get/post/request with the usual requests signatures and
+    records call count, errors and latency.
+    """
+
+    def __init__(self, name: str, policy: dict):
+        self.name = name
+        self.policy = policy
+
+        self._session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=policy["pool_connections"],
+            pool_maxsize=policy["pool_maxsize"],
+            max_retries=_retry(policy),
+        )
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        failed = False
+        try:
+            response = self._session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._lock:
+                self._requests += 1
+                self._errors += failed
+                self._total_ms += elapsed_ms
+                self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _pool_counters(self) -> tuple:
+        """(connections opened, requests sent) across this client's host pools."""
+        opened, sent = 0, 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return opened, sent
+
+    def stats(self) -> dict:
+        opened, sent = self._pool_counters()
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "errors": self._errors,
+                "avg_ms": round(self._total_ms / self._requests, 1) if self._requests else 0.0,
+                "max_ms": round(self._max_ms, 1),
+                "connections_opened": opened,
+                "connection_reuse_rate": round(1 - opened / sent, 3) if sent else 0.0,
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(upstream: str) -> UpstreamClient:
+    """Shared client for an upstream name (see UPSTREAMS)."""
+    client = _clients.get(upstream)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(upstream)
+            if client is None:
+                client = UpstreamClient(upstream, UPSTREAMS.get(upstream, _DEFAULT_POLICY))
+                _clients[upstream] = client
+    return client
+
+
+def http_stats() -> dict:
+    with _clients_lock:
+        clients = dict(_clients)
+    return {name: client.stats() for name, client in clients.items()}
@@ -0,0 +1,91 @@
+# kvb/common/stage_runner.py
+"""
+Concurrent executor for independent request stages.
+Each stage runs on a shared thread pool (or a dedicated one, for
+stages slow enough to starve the rest), has its own timeout and
+fallback value, and records how long it took.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "16"))
+
+_pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
+
+class StageRunner:
+    """
+    Usage:
+        stages = StageRunner()
+        stages.start("location", normalize_location, lat, lng)
+        ...
+        location = stages.result("location", timeout=10, default=fallback)
+        stages.timings()  # {"location": {"ms": 412.3, "status": "ok"}, ...}
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor = None, executors: dict = None):
+        """
+        Args:
+            executor: Pool for stages (default: the shared stage pool)
+            executors: Optional {stage_name: pool} overrides
+        """
+        self._executor = executor or _pool
+        self._executors = executors or {}
+        self._futures = {}
+        self._started = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, started: float, status: str):
+        with self._lock:
+            self._timings[name] = {
+                "ms": round((time.perf_counter() - started) * 1000.0, 1),
+                "status": status,
+            }
+
+    def _timed(self, name: str, fn, args, kwargs):
+        started = time.perf_counter()
+        try:
+            value = fn(*args, **kwargs)
+        except Exception:
+            self._record(name, started, "error")
+            raise
+        self._record(name, started, "ok")
+        return value
+
+    def start(self, name: str, fn, *args, **kwargs):
+        """Schedule a stage in the background."""
+        self._started[name] = time.perf_counter()
+        executor = self._executors.get(name, self._executor)
+        self._futures[name] = executor.submit(self._timed, name, fn, args, kwargs)
+
+    def started(self, name: str) -> bool:
+        return name in self._futures
+
+    def run(self, name: str, fn, *args, **kwargs):
+        """Run a stage in the calling thread, timing it. Exceptions propagate."""
+        return self._timed(name, fn, args, kwargs)
+
+    def result(self, name: str, timeout: float = None, default=None):
+        """
+        Wait for a started stage. On timeout or error the default is
+        returned (callables are invoked to build it lazily). A timed-out
+        stage that has not started yet is cancelled so it never runs.
+        """
+        future = self._futures[name]
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            print(f"Stage '{name}' timed out after {timeout}s. Using fallback.")
+            self._record(name, self._started[name], "timeout")
+        except Exception as e:
+            print(f"Stage '{name}' failed: {e}. Using fallback.")
+        return default() if callable(default) else default
+
+    def timings(self) -> dict:
+        with self._lock:
+            return dict(self._timings)
@@ -0,0 +1,162 @@
+# kvb/common/ttl_cache.py
+"""
+Thread-safe in-process cache with TTL and LRU eviction.
+Optionally backed by a SQLite file so entries survive restarts.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Expired rows are purged from the disk tier every N writes
+_DISK_PRUNE_EVERY = 500
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after ttl_s seconds.
+
+    Values are stored as-is in memory, so callers that mutate what they
+    get back should copy it first. With persist_path set, values are also
+    written through to SQLite as JSON and must be JSON-serializable.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl_s: float = 3600, persist_path: str = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._db = None
+        self._writes = 0
+        if persist_path:
+            self._open_disk(persist_path)
+
+    # ---------------- DISK TIER ----------------
+    def _open_disk(self, path: str):
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, expires_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"[TTLCache:{self.name}] Disk tier disabled: {e}")
+            self._db = None
+
+    def _disk_get(self, key: str):
+        row = self._db.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= time.time():
+            return None
+        return json.loads(value), expires_at
+
+    def _disk_set(self, key: str, value, expires_at: float):
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.name, key, json.dumps(value), expires_at),
+        )
+        self._writes += 1
+        if self._writes % _DISK_PRUNE_EVERY == 0:
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        self._db.commit()
+
+    # ---------------- PUBLIC API ----------------
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+
+            if self._db is not None:
+                try:
+                    found = self._disk_get(key)
+                except Exception as e:
+                    print(f"[TTLCache:{self.name}] Disk read failed: {e}")
+                    found = None
+                if found is not None:
+                    value, expires_at = found
+                    self._store(key, value, expires_at)
+                    self._disk_hits += 1
+                    return value
+
+            self._misses += 1
+            return default
+
+    def set(self, key: str, value, ttl_s: float = None):
+        expires_at = time.time() + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._disk_set(key, value, expires_at)
+                except Exception as e:
+                    print(f"[TTLCache:{self.name}] Disk write failed: {e}")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, key)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    print(f"[TTLCache:{self.name}] Disk delete failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM cache WHERE namespace = ?", (self.name,))
+                    self._db.commit()
+                except Exception as e:
+                    print(f"[TTLCache:{self.name}] Disk clear failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "persistent": self._db is not None,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    # ---------------- INTERNAL ----------------
+    def _store(self, key: str, value, expires_at: float):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
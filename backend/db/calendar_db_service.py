@@ -3,6 +3,7 @@
 Firestore operations for calendar management.
 """
 
+import string
 from firebase_admin import firestore
 from .firebase_init import db
 from datetime import datetime
@@ -177,4 +178,75 @@ def get_active_calendars() -> list:
         calendar["calendarId"] = doc.id
         calendars.append(calendar)
     
-    return calendars
\ No newline at end of file
+    return calendars
+
+# Firestore auto-IDs are 20 characters drawn uniformly from this
+# alphabet, listed here in Firestore's (byte) sort order
+_DOC_ID_ALPHABET = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
+
+def shard_id_range(shard_index: int, shard_count: int) -> tuple:
+    """
+    Document-id bounds of one shard of the calendars collection.
+    
+    Args:
+        shard_index: Zero-based shard number
+        shard_count: Total number of shards (at most 62)
+    
+    Returns:
+        (lower, upper) id bounds, lower inclusive and upper exclusive;
+        None means unbounded
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+    if shard_count > len(_DOC_ID_ALPHABET):
+        raise ValueError(f"At most {len(_DOC_ID_ALPHABET)} shards are supported")
+
+    n = len(_DOC_ID_ALPHABET)
+    lower = None if shard_index == 0 else _DOC_ID_ALPHABET[shard_index * n // shard_count]
+    upper = None if shard_index == shard_count - 1 else _DOC_ID_ALPHABET[(shard_index + 1) * n // shard_count]
+    return lower, upper
+
+
+def iter_active_calendars(page_size: int = 200, start_after: str = None, id_range: tuple = (None, None)):
+    """
+    Page through active calendars in document-id order.
+    
+    Args:
+        page_size: Calendars per page
+        start_after: Resume after this calendar ID (exclusive)
+        id_range: (lower, upper) document-id bounds from shard_id_range
+    
+    Yields:
+        Lists of calendar dicts
+    """
+    if db is None:
+        return
+
+    collection = db.collection("calendars")
+    id_field = firestore.FieldPath.document_id()
+    lower, upper = id_range
+
+    query = collection.where(filter=firestore.FieldFilter("status", "==", "active"))
+    if lower is not None:
+        query = query.where(filter=firestore.FieldFilter(id_field, ">=", collection.document(lower)))
+    if upper is not None:
+        query = query.where(filter=firestore.FieldFilter(id_field, "<", collection.document(upper)))
+    query = query.order_by(id_field).limit(page_size)
+
+    cursor = start_after
+    while True:
+        page_query = query if cursor is None else query.start_after({id_field: collection.document(cursor)})
+
+        page = []
+        for doc in page_query.stream():
+            calendar = doc.to_dict()
+            calendar["calendarId"] = doc.id
+            page.append(calendar)
+
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]["calendarId"]
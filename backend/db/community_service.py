@@ -1,5 +1,6 @@
 # kvb/db/community_service.py
 from .firebase_init import db
+from .disease_aggregate_service import record_case
 from firebase_admin import firestore
 from datetime import datetime
 try:
@@ -57,6 +58,11 @@ def create_post(user_id: str, content: str, lat: float, lng: float, image_url: s
     doc_ref = db.collection("community").document()
     doc_ref.set(post_data)
     
+    if analysis_data:
+        disease = analysis_data.get("disease") or analysis_data.get("predicted_disease", "")
+        record_case(location, disease, analysis_data.get("crop"), source="community",
+                    explainability=analysis_data.get("explainability"))
+    
     return doc_ref.id
 
 
@@ -3,6 +3,7 @@
 from datetime import datetime
 from firebase_admin import firestore
 from .firebase_init import db
+from .disease_aggregate_service import record_case
 
 
 def create_diagnosis(
@@ -49,6 +50,7 @@ def create_diagnosis(
     try:
         ref = db.collection("diagnoses").document()
         ref.set(doc)
+        record_case(location, disease, crop, source="diagnosis", explainability=explainability)
         return ref.id
     except Exception as e:
         print(f"Failed to save diagnosis to DB: {e}")
@@ -0,0 +1,249 @@
+# kvb/db/disease_aggregate_service.py
+"""
+Regional disease case counts, maintained incrementally.
+Recording a case also expires cached prediction alerts around it.
+
+One document per (geohash cell, UTC day) in disease_aggregates:
+    {
+        "cell": "tdr1w", "date": "2026-10-17",
+        "district": ..., "village": ...,
+        "diseases": {
+            "<disease_key>": {
+                "count": int, "lat_sum": float, "lng_sum": float,
+                "diagnosis": int, "community": int, "crops": [...]
+            }
+        }
+    }
+lat_sum/lng_sum give the centroid of a bucket's cases for distance
+weighting. Healthy results are not counted.
+"""
+
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from firebase_admin import firestore
+from .firebase_init import db
+from .job_checkpoint_service import get_checkpoint, save_checkpoint
+
+COLLECTION = "disease_aggregates"
+CELL_PRECISION = 5  # Matches location.geohash written by normalize_location
+
+# job_checkpoints document written once rebuild_aggregates has completed
+BACKFILL_CHECKPOINT = "disease_aggregates_backfill"
+# How often to re-check for the marker while it is missing
+BACKFILL_RECHECK_S = 300
+
+_backfilled = False
+_backfill_checked_at = 0.0
+
+
+def _bucket_id(cell: str, date: str) -> str:
+    return f"{cell}_{date}"
+
+
+def _countable(location: dict, disease: str, explainability: dict = None) -> bool:
+    if not disease or "healthy" in disease.lower():
+        return False
+    # Gemini Vision failures are saved with pseudo-labels such as
+    # "Rate Limit Reached"; they are not cases
+    if (explainability or {}).get("method") == "Error":
+        return False
+    geohash = (location or {}).get("geohash") or ""
+    if len(geohash) < CELL_PRECISION or geohash == "0" * len(geohash):
+        return False
+    return "lat" in location and "lng" in location
+
+
+def record_case(location: dict, disease: str, crop: str = None, source: str = "diagnosis",
+                explainability: dict = None) -> bool:
+    """
+    Add one case to its cell/day bucket.
+
+    Args:
+        location: Normalized location dict (lat, lng, geohash, district, village)
+        disease: Disease key
+        crop: Crop name
+        source: "diagnosis" or "community"
+        explainability: The result's explainability dict; error results are skipped
+
+    Returns:
+        True if a bucket was updated
+    """
+    if db is None or not _countable(location, disease, explainability):
+        return False
+
+    cell = location["geohash"][:CELL_PRECISION]
+    date = datetime.utcnow().strftime("%Y-%m-%d")
+
+    stats = {
+        "count": firestore.Increment(1),
+        "lat_sum": firestore.Increment(location["lat"]),
+        "lng_sum": firestore.Increment(location["lng"]),
+        source: firestore.Increment(1),
+    }
+    if crop:
+        stats["crops"] = firestore.ArrayUnion([crop])
+
+    updated = True
+    try:
+        db.collection(COLLECTION).document(_bucket_id(cell, date)).set({
+            "cell": cell,
+            "date": date,
+            "district": location.get("district"),
+            "village": location.get("village"),
+            "diseases": {disease: stats},
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+        }, merge=True)
+    except Exception as e:
+        print(f"Failed to update disease aggregate: {e}")
+        updated = False
+
+    # The raw document is saved either way, so cached alerts are stale.
+    # Import here to avoid circular dependency
+    try:
+        from prediction.alert_cache import invalidate_near
+        invalidate_near(
+            location["lat"], location["lng"],
+            district=location.get("district"), village=location.get("village"),
+        )
+    except Exception as e:
+        print(f"Failed to invalidate cached alerts: {e}")
+    return updated
+
+
+def query_buckets(cell_prefixes: list, since_date: str, district: str = None, village: str = None) -> list:
+    """
+    Buckets dated on or after since_date whose cell starts with any of
+    cell_prefixes, or whose district/village matches.
+
+    Args:
+        cell_prefixes: Geohash prefixes covering the search area
+        since_date: "YYYY-MM-DD" lower bound (inclusive)
+        district: Optional district name
+        village: Optional village name
+
+    Returns:
+        List of bucket dicts (each at most once)
+    """
+    if db is None:
+        return []
+
+    ref = db.collection(COLLECTION)
+    queries = [
+        ref.where("cell", ">=", prefix).where("cell", "<", prefix + "~").where("date", ">=", since_date)
+        for prefix in cell_prefixes
+    ]
+    if district:
+        queries.append(ref.where("district", "==", district).where("date", ">=", since_date))
+    if village:
+        queries.append(ref.where("village", "==", village).where("date", ">=", since_date))
+
+    buckets = {}
+    for query in queries:
+        for doc in query.stream():
+            if doc.id not in buckets:
+                buckets[doc.id] = doc.to_dict()
+    return list(buckets.values())
+
+
+def aggregates_backfilled() -> bool:
+    """
+    True once rebuild_aggregates has run. Until then the buckets only
+    hold cases recorded since deployment, so readers must scan raw
+    documents instead.
+    """
+    global _backfilled, _backfill_checked_at
+    if _backfilled or db is None:
+        return _backfilled
+
+    now = time.monotonic()
+    if _backfill_checked_at and now - _backfill_checked_at < BACKFILL_RECHECK_S:
+        return False
+    _backfill_checked_at = now
+
+    try:
+        _backfilled = bool((get_checkpoint(BACKFILL_CHECKPOINT) or {}).get("completedAt"))
+    except Exception as e:
+        print(f"Failed to read disease aggregate backfill marker: {e}")
+    return _backfilled
+
+
+def rebuild_aggregates(days: int = 30) -> int:
+    """
+    Recompute buckets for the last `days` days from raw diagnoses and
+    community posts, overwriting existing buckets in that window.
+    Run once when enabling aggregates (readers use the buckets only after
+    this has recorded its backfill marker), or to repair drift.
+
+    Returns:
+        Number of buckets written
+    """
+    if db is None:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    buckets = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+    meta = {}
+    crops = defaultdict(set)
+
+    def add(location, disease, crop, source, created_at, explainability):
+        if not _countable(location, disease, explainability) or not hasattr(created_at, "strftime"):
+            return
+        key = (location["geohash"][:CELL_PRECISION], created_at.strftime("%Y-%m-%d"))
+        meta.setdefault(key, (location.get("district"), location.get("village")))
+        stats = buckets[key][disease]
+        stats["count"] += 1
+        stats["lat_sum"] += location["lat"]
+        stats["lng_sum"] += location["lng"]
+        stats[source] += 1
+        if crop:
+            crops[(key, disease)].add(crop)
+
+    for doc in db.collection("diagnoses").where("createdAt", ">=", cutoff).stream():
+        data = doc.to_dict()
+        add(data.get("location"), data.get("disease", ""), data.get("crop"), "diagnosis",
+            data.get("createdAt"), data.get("explainability"))
+
+    for doc in db.collection("community").where("createdAt", ">=", cutoff).stream():
+        data = doc.to_dict()
+        analysis = data.get("analysisData") or {}
+        disease = analysis.get("disease") or analysis.get("predicted_disease", "")
+        add(data.get("location"), disease, analysis.get("crop"), "community",
+            data.get("createdAt"), analysis.get("explainability"))
+
+    batch = db.batch()
+    pending = 0
+    for (cell, date), diseases in buckets.items():
+        district, village = meta[(cell, date)]
+        batch.set(db.collection(COLLECTION).document(_bucket_id(cell, date)), {
+            "cell": cell,
+            "date": date,
+            "district": district,
+            "village": village,
+            "diseases": {
+                disease: {
+                    **{k: (int(v) if k not in ("lat_sum", "lng_sum") else v) for k, v in stats.items()},
+                    "crops": sorted(crops[((cell, date), disease)]),
+                }
+                for disease, stats in diseases.items()
+            },
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+        })
+        pending += 1
+        if pending % 400 == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+    save_checkpoint(BACKFILL_CHECKPOINT, {
+        "completedAt": datetime.utcnow().isoformat(),
+        "days": days,
+        "buckets": len(buckets),
+    })
+
+    print(f"Rebuilt {len(buckets)} disease aggregate bucket(s) for the last {days} days")
+    return len(buckets)
+
+
+if __name__ == "__main__":
+    rebuild_aggregates()
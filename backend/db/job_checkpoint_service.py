@@ -0,0 +1,51 @@
+# kvb/db/job_checkpoint_service.py
+"""
+Firestore checkpoints for long-running background jobs.
+One document per job (or job shard) records how far the last run got.
+"""
+
+from datetime import datetime
+from typing import Optional
+from firebase_admin import firestore
+from .firebase_init import db
+
+COLLECTION = "job_checkpoints"
+
+
+def get_checkpoint(job_name: str) -> Optional[dict]:
+    """
+    Get the stored checkpoint for a job.
+
+    Args:
+        job_name: Checkpoint document ID
+
+    Returns:
+        Checkpoint dict or None
+    """
+    if db is None:
+        return None
+
+    doc = db.collection(COLLECTION).document(job_name).get()
+    return doc.to_dict() if doc.exists else None
+
+
+def save_checkpoint(job_name: str, checkpoint: dict) -> bool:
+    """
+    Merge fields into a job's checkpoint.
+
+    Args:
+        job_name: Checkpoint document ID
+        checkpoint: Fields to store
+
+    Returns:
+        True if successful
+    """
+    if db is None:
+        return True
+
+    data = checkpoint.copy()
+    data["updatedAt"] = firestore.SERVER_TIMESTAMP
+    db.collection(COLLECTION).document(job_name).set(data, merge=True)
+
+    checkpoint["updatedAt"] = datetime.utcnow().isoformat()
+    return True
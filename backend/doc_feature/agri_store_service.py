@@ -5,7 +5,37 @@ Fetches nearby agricultural stores using Google Places API.
 """
 
 import math
-from location.location_service import nearby_search  # type: ignore
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from common.ttl_cache import TTLCache  # type: ignore
+from location.location_service import nearby_search, encode_geohash, geohash_bounds  # type: ignore
+
+# Search keywords for agricultural stores
+SEARCH_KEYWORDS = ["fertilizer", "agrovet", "pesticide", "agriculture supply", "farming"]
+RESULTS_PER_KEYWORD = 5
+MAX_STORES = 10
+
+# Overall budget for all keyword searches; late results are dropped
+SEARCH_DEADLINE_S = 8
+
+_search_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="agri-store")
+
+# Store results barely change day to day: cache every place Places
+# returns per geohash tile + radius, then filter and rank per caller.
+# The tile's search runs from its centre, widened by half the tile
+# diagonal so it covers radius_km around any point in the tile.
+STORE_TILE_PRECISION = 5  # ≈ 4.9km x 4.9km, same as normalize_location
+PLACES_MAX_RADIUS_M = 50000  # Places Nearby Search limit
+STORE_CACHE_TTL_S = float(os.getenv("STORE_CACHE_TTL_S", str(24 * 3600)))
+_tile_cache = TTLCache(
+    "agri_store_tiles",
+    maxsize=int(os.getenv("STORE_CACHE_SIZE", "2048")),
+    ttl_s=STORE_CACHE_TTL_S,
+    persist_path=os.getenv("STORE_CACHE_PATH"),
+)
+_saved_api_calls = 0
+_metrics_lock = threading.Lock()
 
 
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
@@ -29,55 +59,161 @@ def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     return R * c
 
 
+def _search_places(lat: float, lng: float, radius_m: int):
+    """
+    Run every keyword search concurrently and collect the places.
+    All results are kept, in Places order and tagged with their keyword
+    index; per-keyword limits apply per caller in _to_stores.
+    
+    Returns:
+        (places, complete) where complete is False if any search
+        failed or missed the deadline
+    """
+    places = []
+    complete = True
+    
+    # Issue every keyword search at once over the pooled session
+    futures = [
+        _search_pool.submit(nearby_search, lat, lng, radius_m, keyword, place_type="store")
+        for keyword in SEARCH_KEYWORDS
+    ]
+    done, pending = wait(futures, timeout=SEARCH_DEADLINE_S)
+    if pending:
+        complete = False
+        print(f"Agri store search: {len(pending)} keyword search(es) missed the {SEARCH_DEADLINE_S}s deadline")
+        for f in pending:
+            f.cancel()
+    
+    # Keep keyword order so results are stable between calls
+    for keyword_index, future in enumerate(futures):
+        if future not in done:
+            continue
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Agri store keyword search failed: {e}")
+            complete = False
+            continue
+        
+        if result.get("status") not in ("OK", "ZERO_RESULTS"):
+            complete = False
+            continue
+        
+        for place in result.get("results", []):
+            places.append({
+                "keyword": keyword_index,
+                "place_id": place.get("place_id"),
+                "name": place.get("name"),
+                "lat": place["geometry"]["location"]["lat"],
+                "lng": place["geometry"]["location"]["lng"],
+                "rating": place.get("rating"),
+                "vicinity": place.get("vicinity")
+            })
+    
+    return places, complete
+
+
+def _to_stores(places: list, lat: float, lng: float, radius_km: int) -> list:
+    """
+    Stores within radius_km of the caller's exact position, nearest first:
+    the top RESULTS_PER_KEYWORD per keyword, deduplicated across keywords.
+    """
+    stores = []
+    seen = set()
+    per_keyword = {}
+    for place in places:
+        distance = calculate_distance(lat, lng, place["lat"], place["lng"])
+        if distance > radius_km:
+            continue
+        
+        # Limit per keyword
+        keyword = place.get("keyword", 0)
+        if per_keyword.get(keyword, 0) >= RESULTS_PER_KEYWORD:
+            continue
+        per_keyword[keyword] = per_keyword.get(keyword, 0) + 1
+        
+        # Avoid duplicates across keywords
+        dedupe_key = place.get("place_id") or place.get("name")
+        if dedupe_key in seen:
+            continue
+        seen.add(dedupe_key)
+        
+        stores.append({
+            "name": place["name"],
+            "distance_km": round(distance, 2),  # type: ignore
+            "rating": place["rating"],
+            "maps_url": f"https://maps.google.com/?q={place['lat']},{place['lng']}",
+            "address": place["vicinity"]
+        })
+    
+    # Sort by distance
+    stores.sort(key=lambda x: x["distance_km"])
+    
+    # Return top 10
+    return stores[:MAX_STORES]  # type: ignore
+
+
+def _tile_search_area(tile: str, radius_m: int):
+    """
+    Centre and radius for a tile's shared search: every point within
+    radius_m of any caller in the tile lies inside it.
+
+    Returns:
+        (lat, lng, radius_m)
+    """
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(tile)
+    lat_c = (lat_min + lat_max) / 2
+    lng_c = (lng_min + lng_max) / 2
+    half_diagonal_m = calculate_distance(lat_c, lng_c, lat_max, lng_max) * 1000
+    return lat_c, lng_c, min(int(math.ceil(radius_m + half_diagonal_m)), PLACES_MAX_RADIUS_M)
+
+
 def get_nearby_agri_stores(location: dict, radius_km: int = 10) -> list:
     """
     Get nearby agricultural stores using Google Places API.
+    Farmers in the same geohash tile share one cached search.
     
     Args:
-        location: Normalized location dict with lat, lng
+        location: Normalized location dict with lat, lng (and geohash)
         radius_km: Search radius in kilometers (default 10)
     
     Returns:
         List of agri stores with name, distance, rating, maps_url
     """
+    global _saved_api_calls
+    
     lat = location["lat"]
     lng = location["lng"]
     radius_m = radius_km * 1000  # Convert to meters
     
-    stores = []
-    
-    # Search keywords for agricultural stores
-    keywords = ["fertilizer", "agrovet", "pesticide", "agriculture supply", "farming"]
-    
     try:
-        for keyword in keywords:
-            result = nearby_search(lat, lng, radius_m, keyword, place_type="store")
-            
-            if result.get("status") == "OK":
-                for place in result.get("results", [])[:5]:  # Limit per keyword
-                    place_lat = place["geometry"]["location"]["lat"]
-                    place_lng = place["geometry"]["location"]["lng"]
-                    
-                    distance = calculate_distance(lat, lng, place_lat, place_lng)
-                    
-                    store = {
-                        "name": place.get("name"),
-                        "distance_km": round(distance, 2),  # type: ignore
-                        "rating": place.get("rating"),
-                        "maps_url": f"https://maps.google.com/?q={place_lat},{place_lng}",
-                        "address": place.get("vicinity")
-                    }
-                    
-                    # Avoid duplicates based on name
-                    if not any(s["name"] == store["name"] for s in stores):
-                        stores.append(store)
+        geohash = location.get("geohash") or encode_geohash(lat, lng)
+        # "00000" is the placeholder used when geohash is unavailable
+        tile = geohash[:STORE_TILE_PRECISION] if geohash and geohash.strip("0") else None
+        cache_key = f"{tile}:{radius_km}:all" if tile else None
         
-        # Sort by distance
-        stores.sort(key=lambda x: x["distance_km"])
+        places = _tile_cache.get(cache_key) if cache_key else None
+        if places is not None:
+            with _metrics_lock:
+                _saved_api_calls += len(SEARCH_KEYWORDS)
+        elif tile:
+            places, complete = _search_places(*_tile_search_area(tile, radius_m))
+            # Partial results are served but not cached
+            if complete:
+                _tile_cache.set(cache_key, places)
+        else:
+            places, _ = _search_places(lat, lng, radius_m)
         
-        # Return top 10
-        return stores[:10]  # type: ignore
+        return _to_stores(places, lat, lng, radius_km)
     
     except Exception as e:
         print(f"Failed to fetch agri stores: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+def store_cache_stats() -> dict:
+    """Tile cache hit rate and Places API calls avoided."""
+    stats = _tile_cache.stats()
+    with _metrics_lock:
+        stats["saved_api_calls"] = _saved_api_calls
+    return stats
@@ -0,0 +1,198 @@
+# batch_infer.py
+"""
+Micro-batching inference engine.
+Queues preprocessed images from concurrent requests and runs them
+through the CNN in a single model call.
+
+A batch is closed when it reaches MAX_BATCH_SIZE, or when the oldest
+request has waited MAX_WAIT_MS and no more requests are already queued.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+from .infer import _interpret_predictions  # type: ignore
+
+BATCHING_ENV = "INFERENCE_BATCHING"
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+REQUEST_TIMEOUT_S = 30
+STATS_HISTORY = 100
+
+
+class _InferenceRequest:
+    __slots__ = ("image", "future", "enqueued_at")
+
+    def __init__(self, image):
+        self.image = image
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchInferenceEngine:
+    """Collects single-image requests into batches for one model.predict call."""
+
+    def __init__(self, model, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[_InferenceRequest]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self._batches = 0
+        self._requests = 0
+        self._total_infer_ms = 0.0
+        self._history = deque(maxlen=STATS_HISTORY)
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="batch-inference", daemon=True
+            )
+            self._thread.start()
+
+    def shutdown(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---------------- PUBLIC API ----------------
+    def submit(self, image, timeout: float = REQUEST_TIMEOUT_S) -> dict:
+        """
+        Queue one preprocessed image of shape (IMG_SIZE, IMG_SIZE, 3) and
+        block until its batch has been classified.
+
+        Returns the same dict as run_inference; raises ValueError on a
+        low-confidence or ambiguous prediction.
+        """
+        self.start()
+        request = _InferenceRequest(image)
+        self._queue.put(request)
+        return request.future.result(timeout=timeout)
+
+    def stats(self) -> dict:
+        """Aggregate and per-batch occupancy / latency stats."""
+        with self._lock:
+            history = list(self._history)
+            batches = self._batches
+            requests_count = self._requests
+            total_infer_ms = self._total_infer_ms
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "batches": batches,
+            "requests": requests_count,
+            "avg_batch_size": round(requests_count / batches, 2) if batches else 0.0,
+            "avg_occupancy": round(requests_count / (batches * self.max_batch_size), 3) if batches else 0.0,
+            "avg_infer_ms": round(total_infer_ms / batches, 2) if batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "recent_batches": history,
+        }
+
+    # ---------------- WORKER ----------------
+    def _collect_batch(self) -> list:
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_s
+
+        # Under load the head request may already be past its deadline
+        # (it queued while the previous batch ran). Requests that are
+        # already waiting still join the batch; only the wait for new
+        # arrivals is bounded by the deadline.
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: list):
+        started = time.perf_counter()
+        queue_wait_ms = (started - batch[0].enqueued_at) * 1000.0
+
+        try:
+            images = np.stack([r.image for r in batch]).astype("float32")
+            preds = self.model.predict(images, verbose=0)
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+            return
+
+        infer_ms = (time.perf_counter() - started) * 1000.0
+
+        for r, p in zip(batch, preds):
+            try:
+                r.future.set_result(_interpret_predictions(p))
+            except Exception as e:
+                r.future.set_exception(e)
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._total_infer_ms += infer_ms
+            self._history.append({
+                "size": len(batch),
+                "occupancy": round(len(batch) / self.max_batch_size, 3),
+                "queue_wait_ms": round(queue_wait_ms, 2),
+                "infer_ms": round(infer_ms, 2),
+            })
+
+
+# ---------------- SHARED ENGINE ----------------
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def batching_enabled() -> bool:
+    return os.getenv(BATCHING_ENV, "0").lower() in ("1", "true", "yes")
+
+
+def get_inference_engine() -> BatchInferenceEngine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from .model_registry import get_model  # type: ignore
+                model = get_model()
+                if model is None:
+                    raise RuntimeError("Model not loaded; batched inference unavailable")
+                _engine = BatchInferenceEngine(model)
+                _engine.start()
+    return _engine
@@ -0,0 +1,88 @@
+# diagnosis_jobs.py
+"""
+Asynchronous diagnosis jobs.
+The request thread runs only classify_image; LLM enrichment, the
+Firestore write and the agri store lookup run on a bounded worker pool.
+Clients poll the job until it is completed or failed.
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from common.ttl_cache import TTLCache  # type: ignore
+from .pipeline import enrich_diagnosis  # type: ignore
+
+JOB_WORKERS = int(os.getenv("DIAGNOSIS_JOB_WORKERS", "4"))
+# Jobs accepted but not yet finished; beyond this new jobs are refused
+MAX_PENDING_JOBS = int(os.getenv("DIAGNOSIS_MAX_PENDING_JOBS", "64"))
+JOB_TTL_S = 3600
+
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="diagnosis-job")
+_pending = threading.BoundedSemaphore(MAX_PENDING_JOBS)
+
+# Job records are replaced, never mutated, so readers always see a
+# consistent snapshot. Kept in-process: poll the worker that took the job.
+_jobs = TTLCache("diagnosis_jobs", maxsize=10000, ttl_s=JOB_TTL_S)
+
+
+class JobQueueFull(Exception):
+    """Raised when MAX_PENDING_JOBS jobs are already in flight."""
+
+
+def _record(job_id: str, status: str, result: dict, created_at: str, error: str = None) -> dict:
+    return {
+        "jobId": job_id,
+        "status": status,
+        "result": result,
+        "error": error,
+        "createdAt": created_at,
+        "updatedAt": datetime.utcnow().isoformat(),
+    }
+
+
+def _run_job(job_id: str, classification: dict, lat: float, lng: float, created_at: str):
+    try:
+        result = enrich_diagnosis(classification, lat, lng)
+        _jobs.set(job_id, _record(job_id, STATUS_COMPLETED, result, created_at))
+    except Exception as e:
+        print(f"Diagnosis job {job_id} failed: {e}")
+        partial = dict(classification["cnn_output"])
+        _jobs.set(job_id, _record(job_id, STATUS_FAILED, partial, created_at, error=str(e)))
+    finally:
+        _pending.release()
+
+
+def submit_job(classification: dict, lat: float, lng: float) -> dict:
+    """
+    Queue enrichment for an already classified image.
+
+    Returns the initial job record, whose result holds the CNN output.
+    Raises JobQueueFull when the pool is saturated.
+    """
+    if not _pending.acquire(blocking=False):
+        raise JobQueueFull("Too many diagnosis jobs in progress. Please retry shortly.")
+
+    job_id = uuid.uuid4().hex
+    created_at = datetime.utcnow().isoformat()
+    record = _record(job_id, STATUS_PROCESSING, dict(classification["cnn_output"]), created_at)
+    _jobs.set(job_id, record)
+
+    try:
+        _executor.submit(_run_job, job_id, classification, lat, lng, created_at)
+    except Exception:
+        _pending.release()
+        raise
+
+    return record
+
+
+def get_job(job_id: str) -> dict:
+    """Current job record, or None if unknown or expired."""
+    return _jobs.get(job_id)
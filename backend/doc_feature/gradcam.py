@@ -4,6 +4,8 @@ Grad-CAM explainability module.
 NO printing. NO model loading here.
 """
 
+import threading
+
 # --- OPTIONAL MOCK FOR DEPENDENCIES ---
 try:
     import numpy as np  # type: ignore
@@ -35,69 +37,85 @@ def _find_last_conv_layer(model):
     return last_conv or LAST_CONV_LAYER
 
 
-def _preprocess(image_path: str):
-    if not CV2_AVAILABLE:
-        raise ImportError("OpenCV not available")
-
-    img = cv2.imread(image_path)  # type: ignore
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # type: ignore
-    img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))  # type: ignore
-    img = img.astype("float32") / 255.0
-    return np.expand_dims(img, axis=0)  # type: ignore
+# One compiled Grad-CAM function per loaded classifier: id(model) -> (model, fn)
+_GRADCAM_FNS = {}
+_GRADCAM_LOCK = threading.Lock()
 
 
-def compute_gradcam(image_tensor, model):
-    if not TF_AVAILABLE or model is None:
-        # Return dummy heatmap
-        return np.zeros((IMG_SIZE, IMG_SIZE))  # type: ignore
-
-    try:
-        # Find the target conv layer
-        layer_name = _find_last_conv_layer(model)
-        last_conv = model.get_layer(layer_name)
+def _build_gradcam_fn(model):
+    """
+    Build the conv-output sub-model once and wrap the gradient pass in a
+    tf.function with a fixed input signature, so it is traced only once.
+    """
+    layer_name = _find_last_conv_layer(model)
+    last_conv = model.get_layer(layer_name)
 
-        grad_model = tf.keras.models.Model(
-            model.inputs,
-            [last_conv.output, model.output]
-        )
+    grad_model = tf.keras.models.Model(
+        model.inputs,
+        [last_conv.output, model.output]
+    )
 
+    @tf.function(input_signature=[
+        tf.TensorSpec(shape=(None, IMG_SIZE, IMG_SIZE, 3), dtype=tf.float32)
+    ])
+    def gradcam_fn(images):
         with tf.GradientTape() as tape:
-            conv_out, preds = grad_model(image_tensor, training=False)
+            conv_out, preds = grad_model(images, training=False)
 
             # Keras Functional safety
-            if isinstance(preds, list):
+            if isinstance(preds, (list, tuple)):
                 preds = preds[0]
 
-            preds = tf.convert_to_tensor(preds)
-
-            pred_class = tf.argmax(preds[0])
-            class_score = preds[:, pred_class]
+            pred_class = tf.argmax(preds, axis=-1)
+            class_score = tf.gather(preds, pred_class, axis=1, batch_dims=1)
 
         grads = tape.gradient(class_score, conv_out)
-        
-        if grads is None:
-            print("Grad-CAM: gradients returned None, returning zero heatmap")
-            return np.zeros((IMG_SIZE, IMG_SIZE))  # type: ignore
 
-        pooled_grads = tf.reduce_mean(grads, axis=(0, 1, 2))
+        # Per-image channel weights -> (batch, channels)
+        pooled_grads = tf.reduce_mean(grads, axis=(1, 2))
+
+        heatmaps = tf.einsum("bhwc,bc->bhw", conv_out, pooled_grads)
+        heatmaps = tf.maximum(heatmaps, 0)
+
+        denom = tf.reduce_max(heatmaps, axis=(1, 2), keepdims=True)
+        heatmaps = tf.math.divide_no_nan(heatmaps, denom)
+
+        return heatmaps, preds
+
+    return gradcam_fn
+
 
-        heatmap = tf.reduce_sum(conv_out[0] * pooled_grads, axis=-1)
-        heatmap = tf.maximum(heatmap, 0)
+def _get_gradcam_fn(model):
+    key = id(model)
+    entry = _GRADCAM_FNS.get(key)
+    if entry is None:
+        with _GRADCAM_LOCK:
+            entry = _GRADCAM_FNS.get(key)
+            if entry is None:
+                # Keep a reference to the model so its id is never reused
+                entry = (model, _build_gradcam_fn(model))
+                _GRADCAM_FNS[key] = entry
+    return entry[1]
 
-        denom = tf.reduce_max(heatmap)
-        heatmap = tf.cond(
-            denom > 0,
-            lambda: heatmap / denom,
-            lambda: heatmap
-        )
 
-        return heatmap.numpy()
+def compute_gradcam_batch(image_batch, model):
+    """
+    Heatmaps for a batch of preprocessed images of shape
+    (N, IMG_SIZE, IMG_SIZE, 3). Returns an array of N heatmaps.
+    """
+    if not TF_AVAILABLE or model is None:
+        return np.zeros((len(image_batch), IMG_SIZE, IMG_SIZE))  # type: ignore
+
+    try:
+        heatmaps, _ = _get_gradcam_fn(model)(tf.convert_to_tensor(image_batch, dtype=tf.float32))
+        return heatmaps.numpy()
     except Exception as e:
-        print(f"Grad-CAM computation failed: {e}. Returning zero heatmap.")
-        return np.zeros((IMG_SIZE, IMG_SIZE))  # type: ignore
+        print(f"Grad-CAM computation failed: {e}. Returning zero heatmaps.")
+        return np.zeros((len(image_batch), IMG_SIZE, IMG_SIZE))  # type: ignore
+
+
+def compute_gradcam(image_tensor, model):
+    return compute_gradcam_batch(image_tensor, model)[0]
 
 
 def gradcam_summary(heatmap) -> str:
@@ -111,7 +129,34 @@ def gradcam_summary(heatmap) -> str:
         return "Focused strongly on lesions, spots, or discoloration."
 
 
-def run_gradcam(image_path: str, cnn_output: dict, model) -> dict:
+def run_fused(image_tensor, model) -> dict:
+    """
+    Classify and explain in a single GradientTape pass.
+
+    Returns the run_inference dict with "explainability" attached.
+    Raises ValueError on a low-confidence or ambiguous prediction,
+    exactly like run_inference.
+    """
+    from .infer import _interpret_predictions  # type: ignore
+
+    heatmaps, preds = _get_gradcam_fn(model)(tf.convert_to_tensor(image_tensor, dtype=tf.float32))
+
+    cnn_output = _interpret_predictions(preds.numpy()[0])
+    cnn_output["explainability"] = {
+        "method": "Grad-CAM",
+        "summary": gradcam_summary(heatmaps.numpy()[0])
+    }
+    return cnn_output
+
+
+def run_gradcam(image_tensor, cnn_output: dict, model) -> dict:
+    """
+    Attach a Grad-CAM explanation to cnn_output.
+
+    Args:
+        image_tensor: Preprocessed (1, IMG_SIZE, IMG_SIZE, 3) tensor,
+                      the same one used for inference
+    """
     if not CV2_AVAILABLE:
         cnn_output["explainability"] = {
             "method": "Mock Grad-CAM",
@@ -120,7 +165,6 @@ def run_gradcam(image_path: str, cnn_output: dict, model) -> dict:
         return cnn_output
 
     try:
-        image_tensor = _preprocess(image_path)
         heatmap = compute_gradcam(image_tensor, model)
 
         cnn_output["explainability"] = {
@@ -28,22 +28,13 @@ except ImportError:
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-MODEL_PATH = os.path.join(BASE_DIR, "model", "plant_disease_model.h5")
 LABEL_PATH = os.path.join(BASE_DIR, "model", "class_indices.pkl")
 
 IMG_SIZE = 224
 CONFIDENCE_THRESHOLD = 0.50
 CONFIDENCE_GAP_THRESHOLD = 0.20
 
-# Load once
-if TF_AVAILABLE and CV2_AVAILABLE:
-    try:
-        model = tf.keras.models.load_model(MODEL_PATH)
-    except Exception as e:
-        print(f"Failed to load model: {e}")
-        model = None
-else:
-    model = None
+from .model_registry import get_model  # type: ignore
 
 try:
     with open(LABEL_PATH, "rb") as f:
@@ -53,6 +44,15 @@ except Exception as e:
     print(f"⚠️ Failed to load labels: {e}")
     idx_to_class = {}
 
+def _to_tensor(img):
+    """BGR uint8 image -> normalized (1, IMG_SIZE, IMG_SIZE, 3) float32 tensor."""
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
+    img = img.astype(np.float32)
+    img /= 255.0
+    return np.expand_dims(img, axis=0)
+
+
 def _preprocess(image_path: str):
     if not CV2_AVAILABLE:
         raise ImportError("OpenCV not available")
@@ -61,25 +61,34 @@ def _preprocess(image_path: str):
     if img is None:
         raise FileNotFoundError(f"Image not found: {image_path}")
 
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
-    img = img.astype("float32") / 255.0
-    return np.expand_dims(img, axis=0)
+    return _to_tensor(img)
 
 
-def run_inference(image_path: str) -> dict:
-    if not TF_AVAILABLE or not CV2_AVAILABLE or model is None:
-        # RETURN MOCK RESULT
-        print("Returning MOCK inference result (Missing Deps/Model)")
-        return {
-            "crop": "MockCrop",
-            "predicted_disease": "MockCrop___Healthy",
-            "confidence": 0.99
-        }
+def decode_image(image_bytes):
+    """
+    Decode an uploaded image straight from memory (no temp file).
+    Accepts raw bytes or a uint8 NumPy buffer of the encoded file.
+    The returned tensor is shared by inference and Grad-CAM.
+    """
+    if not CV2_AVAILABLE:
+        raise ImportError("OpenCV not available")
 
-    image = _preprocess(image_path)
-    preds = model.predict(image, verbose=0)[0]
+    buf = image_bytes
+    if not isinstance(buf, np.ndarray):
+        buf = np.frombuffer(buf, dtype=np.uint8)
 
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image data. Please upload a valid JPEG or PNG photo.")
+
+    return _to_tensor(img)
+
+
+def _interpret_predictions(preds) -> dict:
+    """
+    Turn a single softmax vector into the diagnosis dict.
+    Raises ValueError when the prediction is too weak or ambiguous.
+    """
     sorted_idx = preds.argsort()[::-1]
     top1, top2 = sorted_idx[0], sorted_idx[1]
 
@@ -99,3 +108,33 @@ def run_inference(image_path: str) -> dict:
         "predicted_disease": label,
         "confidence": top1_conf
     }
+
+
+def run_inference(image) -> dict:
+    """
+    Classify a plant image.
+
+    Args:
+        image: Path to an image file, or a tensor already produced
+               by decode_image()
+    """
+    model = get_model() if TF_AVAILABLE and CV2_AVAILABLE else None
+    if model is None:
+        # RETURN MOCK RESULT
+        print("Returning MOCK inference result (Missing Deps/Model)")
+        return {
+            "crop": "MockCrop",
+            "predicted_disease": "MockCrop___Healthy",
+            "confidence": 0.99
+        }
+
+    if isinstance(image, str):
+        image = _preprocess(image)
+
+    # Micro-batching: share one model call with concurrent requests
+    from .batch_infer import batching_enabled, get_inference_engine  # type: ignore
+    if batching_enabled():
+        return get_inference_engine().submit(image[0])
+
+    preds = model.predict(image, verbose=0)[0]
+    return _interpret_predictions(preds)
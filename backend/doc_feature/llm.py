@@ -5,10 +5,14 @@ Consumes ONLY verified ML + Grad-CAM output.
 """
 
 import os
+import copy
 import json
 import requests  # type: ignore
 import base64
 
+from common.http_client import get_client  # type: ignore
+from common.ttl_cache import TTLCache  # type: ignore
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # Gemini model fallback chain: try newer models first, fall back to older ones
@@ -18,11 +22,28 @@ API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
 API_URL = f"{API_BASE}/{MODEL_NAME}:generateContent"
 MIN_CONFIDENCE = 0.60
 
+_http = get_client("gemini")
+
+# Explanations depend on disease label, crop and Grad-CAM summary only,
+# so repeat diagnoses are answered from memory instead of a Gemini call
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+_explanation_cache = TTLCache(
+    "llm_explanations",
+    maxsize=LLM_CACHE_SIZE,
+    ttl_s=LLM_CACHE_TTL_S,
+    persist_path=os.getenv("LLM_CACHE_PATH"),
+)
+
 import time
 
-def analyze_image_with_gemini(image_path: str) -> dict:
+def analyze_image_with_gemini(image, mime_type: str = "image/jpeg") -> dict:
     """
     Fallback: Diagnose crop disease directly using Gemini Vision.
+
+    Args:
+        image: Raw image bytes or uint8 NumPy buffer (or a path to an image file)
+        mime_type: MIME type of the encoded image
     """
     if not GEMINI_API_KEY:
         print("GEMINI_API_KEY not set. Cannot use Cloud AI.")
@@ -30,8 +51,10 @@ def analyze_image_with_gemini(image_path: str) -> dict:
 
     try:
         # 1. Encode image to base64
-        with open(image_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode("utf-8")
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                image = f.read()
+        image_data = base64.b64encode(image).decode("utf-8")
 
         prompt = """
         You are an expert plant pathologist AI.
@@ -68,7 +91,7 @@ def analyze_image_with_gemini(image_path: str) -> dict:
                         {"text": prompt},
                         {
                             "inline_data": {
-                                "mime_type": "image/jpeg",
+                                "mime_type": mime_type,
                                 "data": image_data
                             }
                         }
@@ -87,7 +110,7 @@ def analyze_image_with_gemini(image_path: str) -> dict:
             current_url = f"{API_BASE}/{current_model}:generateContent"
             
             try:
-                response = requests.post(
+                response = _http.post(
                     f"{current_url}?key={GEMINI_API_KEY}",
                     headers={"Content-Type": "application/json"},
                     data=json.dumps(payload),
@@ -185,12 +208,40 @@ def _extract_json(text: str) -> dict:
     return json.loads(json_text)
 
 
+def _explanation_cache_key(ml_output: dict) -> str:
+    return json.dumps([
+        ml_output["predicted_disease"],
+        ml_output["crop"],
+        ml_output["explainability"]["summary"],
+    ])
+
+
+def explanation_cache_stats() -> dict:
+    return _explanation_cache.stats()
+
+
 def get_llm_explanation(ml_output: dict) -> dict:
+    explanation, _ = explain_with_source(ml_output)
+    return explanation
+
+
+def explain_with_source(ml_output: dict) -> tuple:
+    """
+    Same as get_llm_explanation, but also says where the answer came from.
+
+    Returns:
+        (explanation, source) where source is "gemini" or "local"
+    """
     _validate_ml_output(ml_output)
 
     if not GEMINI_API_KEY:
         print("GEMINI_API_KEY not set. Returning local explanation.")
-        return _generate_local_explanation(ml_output)
+        return _generate_local_explanation(ml_output), "local"
+
+    cache_key = _explanation_cache_key(ml_output)
+    cached = _explanation_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached), "gemini"
 
     prompt = f"""
 You are an agricultural plant pathology explanation system.
@@ -217,7 +268,7 @@ prevention_tips
     for model_name in GEMINI_MODELS:
         url = f"{API_BASE}/{model_name}:generateContent"
         try:
-            response = requests.post(
+            response = _http.post(
                 f"{url}?key={GEMINI_API_KEY}",
                 headers={"Content-Type": "application/json"},
                 data=json.dumps(payload),
@@ -234,7 +285,10 @@ prevention_tips
 
             response.raise_for_status()
             raw = response.json()["candidates"][0]["content"]["parts"][0]["text"]
-            return _extract_json(raw)
+            explanation = _extract_json(raw)
+            # Local fallbacks are not cached so Gemini is retried later
+            _explanation_cache.set(cache_key, copy.deepcopy(explanation))
+            return explanation, "gemini"
         
         except Exception as e:
             print(f"LLM API Error ({model_name}): {e}")
@@ -242,7 +296,7 @@ prevention_tips
 
     # All models failed — return local explanation
     print("All Gemini models failed. Returning local explanation.")
-    return _generate_local_explanation(ml_output)
+    return _generate_local_explanation(ml_output), "local"
 
 
 # --- LOCAL KNOWLEDGE BASE (No API needed) ---
@@ -0,0 +1,134 @@
+# model_registry.py
+"""
+Single shared instance of the plant disease model.
+infer.py, pipeline.py and gradcam.py all get the model from here,
+so each worker loads the .h5 exactly once.
+"""
+
+import math
+import os
+import threading
+import time
+
+# --- OPTIONAL MOCK FOR TENSORFLOW ---
+try:
+    import tensorflow as tf  # type: ignore
+    TF_AVAILABLE = True
+except ImportError:
+    TF_AVAILABLE = False
+
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODEL_PATH = os.path.join(BASE_DIR, "model", "plant_disease_model.h5")
+IMG_SIZE = 224
+
+_model = None
+_load_attempted = False
+_lock = threading.Lock()
+
+_info = {
+    "path": MODEL_PATH,
+    "loaded": False,
+    "load_time_s": None,
+    "warm_up_time_s": None,
+    "param_count": None,
+    "param_bytes": None,
+    "rss_delta_bytes": None,
+    "error": None,
+}
+
+
+def _current_rss_bytes():
+    """Resident set size right now (not the peak), or None if unknown."""
+    try:
+        # Linux: second field is resident pages
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def _load():
+    global _model
+
+    if not TF_AVAILABLE:
+        _info["error"] = "TensorFlow not available"
+        return
+
+    rss_before = _current_rss_bytes()
+    started = time.perf_counter()
+    try:
+        _model = tf.keras.models.load_model(MODEL_PATH)
+    except Exception as e:
+        print(f"Failed to load model: {e}")
+        _info["error"] = str(e)
+        return
+
+    _info["load_time_s"] = round(time.perf_counter() - started, 3)
+    _info["loaded"] = True
+
+    rss_after = _current_rss_bytes()
+    if rss_before is not None and rss_after is not None:
+        _info["rss_delta_bytes"] = rss_after - rss_before
+
+    param_count = int(_model.count_params())
+    _info["param_count"] = param_count
+    _info["param_bytes"] = int(sum(
+        math.prod(w.shape) * tf.as_dtype(w.dtype).size for w in _model.weights
+    ))
+
+    print(f"Model loaded in {_info['load_time_s']}s ({param_count} params)")
+
+
+def get_model():
+    """Return the shared model, loading it on first use. None if unavailable."""
+    global _load_attempted
+    if not _load_attempted:
+        with _lock:
+            if not _load_attempted:
+                try:
+                    _load()
+                finally:
+                    _load_attempted = True
+    return _model
+
+
+def warm_up():
+    """
+    Load the model eagerly and run one dummy forward pass so the first
+    real request does not pay for graph building.
+    """
+    model = get_model()
+    if model is None:
+        return None
+
+    started = time.perf_counter()
+    dummy = tf.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=tf.float32)
+    model(dummy, training=False)
+    _info["warm_up_time_s"] = round(time.perf_counter() - started, 3)
+    return model
+
+
+def model_version() -> str:
+    """
+    Identifier of the model file on disk (size + mtime), cheap enough to
+    use in cache keys without loading the model.
+    """
+    try:
+        st = os.stat(MODEL_PATH)
+        return f"h5-{st.st_size}-{int(st.st_mtime)}"
+    except OSError:
+        return "no-local-model"
+
+
+def model_info() -> dict:
+    """Load time and memory footprint of the shared model."""
+    return dict(_info)
@@ -5,6 +5,12 @@ CNN → Grad-CAM → LLM → Firestore
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
 
 # --- OPTIONAL MOCK FOR TENSORFLOW ---
 try:
@@ -15,45 +21,78 @@ except ImportError:
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-from .infer import run_inference  # type: ignore
-from .gradcam import run_gradcam  # type: ignore
-from .llm import get_llm_explanation  # type: ignore
+from .infer import run_inference, decode_image, CV2_AVAILABLE  # type: ignore
+from .gradcam import run_gradcam, run_fused  # type: ignore
+from .llm import explain_with_source  # type: ignore
 from db.diagnosis_service import create_diagnosis  # type: ignore
-from location.location_service import normalize_location  # type: ignore
+from location.location_service import normalize_location, encode_geohash  # type: ignore
+from .model_registry import get_model  # type: ignore
+from .result_cache import cache_key, get_cached_result, store_result  # type: ignore
+from common.stage_runner import StageRunner  # type: ignore
 
-MODEL_PATH = os.path.join(BASE_DIR, "model", "plant_disease_model.h5")
+# Single forward+backward pass for classification and Grad-CAM
+FUSED_GRADCAM = os.getenv("FUSED_GRADCAM", "0").lower() in ("1", "true", "yes")
 
-# Load once
-if TF_AVAILABLE:
-    try:
-        model = tf.keras.models.load_model(MODEL_PATH)
-    except Exception as e:
-        print(f"Failed to load model: {e}")
-        model = None
-else:
-    model = None
+# Per-stage timeouts (seconds); a stage that overruns gets its fallback
+LOCATION_STAGE_TIMEOUT_S = 12
+STORES_STAGE_TIMEOUT_S = 15
+LLM_STAGE_TIMEOUT_S = 45
 
+# Gemini calls can outlive their stage timeout (several models x 60s), so
+# they get their own pool and never hold the workers location/stores need
+_llm_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_STAGE_WORKERS", "8")),
+    thread_name_prefix="llm-stage",
+)
 
-def run_pipeline(image_path: str, user_id: str, lat: float, lng: float) -> dict:
+
+def _new_stages() -> StageRunner:
+    return StageRunner(executors={"llm": _llm_pool})
+
+
+def classify_image(image, user_id: str, mime_type: str = None) -> dict:
     """
-    Run full AI pipeline with location integration.
-    
-    Args:
-        image_path: Path to plant image
-        user_id: User ID
-        lat: Latitude
-        lng: Longitude
+    Fast part of the pipeline: cache lookup, CNN and Grad-CAM
+    (or Gemini Vision when local AI is missing).
+    Raises ValueError when the image is rejected.
     
     Returns:
-        Complete diagnosis with location and nearby agri stores
+        {
+            "cnn_output": dict,
+            "llm_output": dict | None (None until enrich_diagnosis runs),
+            "result_key": str,
+            "cacheable": bool
+        }
     """
-    # Step 0: Check for Local AI
-    if not TF_AVAILABLE:
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+
+    # Zero-copy view over the upload, shared by every stage below
+    if np is not None:
+        image = np.frombuffer(image, dtype=np.uint8)
+
+    # Step 0: Same photo seen before? Reuse CNN + Grad-CAM + LLM output
+    result_key = cache_key(image)
+    cached = get_cached_result(result_key)
+    llm_output = None
+    cacheable = True
+
+    if cached is not None:
+        cnn_output, llm_output = cached
+        cnn_output["userId"] = user_id
+        # Already stored
+        cacheable = False
+
+    # Check for Local AI
+    elif not TF_AVAILABLE:
         print("Using Gemini Vision for diagnosis (Local AI missing)...")
         from .llm import analyze_image_with_gemini  # type: ignore
         
         # Cloud AI does everything in one shot
-        cloud_result = analyze_image_with_gemini(image_path)
+        if not mime_type or not mime_type.startswith("image/"):
+            mime_type = "image/jpeg"
+        cloud_result = analyze_image_with_gemini(image, mime_type)
         
         cnn_output = {
             "crop": cloud_result.get("crop", "Unknown"),
@@ -63,48 +102,140 @@ def run_pipeline(image_path: str, user_id: str, lat: float, lng: float) -> dict:
             "userId": user_id
         }
         llm_output = cloud_result.get("llm", {})
+        # Don't remember quota/network failures
+        cacheable = cnn_output["explainability"].get("method") != "Error"
         
         # Skip steps 1, 2, 3
     else: 
-        # Step 1: CNN Inference
-        cnn_output = run_inference(image_path)
+        # Image decoded once, reused by CNN and Grad-CAM
+        image_tensor = decode_image(image) if CV2_AVAILABLE else None
+        model = get_model()
+        cnn_output = None
+
+        # Steps 1+2 fused: one tape pass gives class scores and heatmap
+        if FUSED_GRADCAM and image_tensor is not None and model is not None:
+            try:
+                cnn_output = run_fused(image_tensor, model)
+            except ValueError:
+                raise
+            except Exception as e:
+                print(f"Fused CNN + Grad-CAM failed: {e}. Falling back to two-pass mode.")
+
+        if cnn_output is None:
+            # Step 1: CNN Inference
+            cnn_output = run_inference(image_tensor)
+            
+            # Step 2: Grad-CAM Explainability
+            try:
+                cnn_output = run_gradcam(image_tensor, cnn_output, model)
+            except Exception as e:
+                print(f"Grad-CAM step failed: {e}. Adding fallback explainability.")
+                cnn_output["explainability"] = {
+                    "method": "CNN Analysis",
+                    "summary": f"AI detected patterns consistent with {cnn_output.get('predicted_disease', 'unknown')}."
+                }
+
         cnn_output["userId"] = user_id
         
-        # Step 2: Grad-CAM Explainability
-        try:
-            cnn_output = run_gradcam(image_path, cnn_output, model)
-        except Exception as e:
-            print(f"Grad-CAM step failed: {e}. Adding fallback explainability.")
-            cnn_output["explainability"] = {
-                "method": "CNN Analysis",
-                "summary": f"AI detected patterns consistent with {cnn_output.get('predicted_disease', 'unknown')}."
-            }
-        
         # Ensure explainability key exists before LLM step
         if "explainability" not in cnn_output:
             cnn_output["explainability"] = {
                 "method": "CNN Analysis",
                 "summary": f"Pattern analysis identified {cnn_output.get('predicted_disease', 'unknown')}."
             }
-        
-        # Step 3: LLM Explanation
-        try:
-            llm_output = get_llm_explanation(cnn_output)
-        except Exception as e:
-            print(f"LLM step failed: {e}. Using local explanation.")
-            from .llm import _generate_local_explanation  # type: ignore
-            llm_output = _generate_local_explanation(cnn_output)
-    
-    # Step 4: Normalize Location
+
+    return {
+        "cnn_output": cnn_output,
+        "llm_output": llm_output,
+        "result_key": result_key,
+        "cacheable": cacheable
+    }
+
+
+def _fallback_location(lat: float, lng: float) -> dict:
+    """Same shape as normalize_location's own fallback, so the case stays queryable."""
+    return {
+        "lat": lat,
+        "lng": lng,
+        "state": None,
+        "district": None,
+        "village": None,
+        "geohash": encode_geohash(lat, lng) or "00000"
+    }
+
+
+def _fetch_agri_stores(lat: float, lng: float) -> list:
+    from .agri_store_service import get_nearby_agri_stores  # type: ignore
+    return get_nearby_agri_stores({"lat": lat, "lng": lng}, radius_km=10)
+
+
+def _start_location_stages(stages: StageRunner, lat: float, lng: float):
+    """Geocoding and the store lookup only need lat/lng, so start them first."""
+    if not stages.started("location"):
+        stages.start("location", normalize_location, lat, lng)
+    if not stages.started("stores"):
+        stages.start("stores", _fetch_agri_stores, lat, lng)
+
+
+def _explain(cnn_output: dict) -> tuple:
+    """(explanation, source); source is "gemini" or "local"."""
     try:
-        location = normalize_location(lat, lng)
+        return explain_with_source(cnn_output)
     except Exception as e:
-        print(f"Location normalization failed: {e}. Using defaults.")
-        location = {"lat": lat, "lng": lng, "state": "Unknown", "district": "Unknown", "village": "Unknown"}
+        print(f"LLM step failed: {e}. Using local explanation.")
+        from .llm import _generate_local_explanation  # type: ignore
+        return _generate_local_explanation(cnn_output), "local"
+
+
+def enrich_diagnosis(classification: dict, lat: float, lng: float, stages: StageRunner = None) -> dict:
+    """
+    Slow part of the pipeline: LLM explanation, location,
+    nearby agri stores (all concurrent) and finally the Firestore write.
+    
+    Args:
+        classification: Output of classify_image
+        lat: Latitude
+        lng: Longitude
+        stages: Runner on which location/stores may already be started
+    
+    Returns:
+        Complete diagnosis with location, nearby agri stores and
+        per-stage timings under "meta"
+    """
+    stages = stages or _new_stages()
+    _start_location_stages(stages, lat, lng)
+
+    cnn_output = classification["cnn_output"]
+    llm_output = classification["llm_output"]
+    cacheable = classification["cacheable"]
+
+    # Step 3: LLM Explanation (overlaps with geocoding and store lookup)
+    if llm_output is None:
+        from .llm import _generate_local_explanation  # type: ignore
+        stages.start("llm", _explain, cnn_output)
+        llm_output, llm_source = stages.result(
+            "llm", timeout=LLM_STAGE_TIMEOUT_S,
+            default=lambda: (_generate_local_explanation(cnn_output), "local")
+        )
+        # Local fallbacks are not cached so Gemini is retried for this photo
+        cacheable = cacheable and llm_source == "gemini"
+
+    if cacheable:
+        store_result(classification["result_key"], cnn_output, llm_output)
+    
+    # Step 4: Normalize Location
+    location = stages.result(
+        "location", timeout=LOCATION_STAGE_TIMEOUT_S,
+        default=lambda: _fallback_location(lat, lng)
+    )
+    
+    # Step 5: Get Nearby Agri Stores
+    agri_stores = stages.result("stores", timeout=STORES_STAGE_TIMEOUT_S, default=list)
     
-    # Step 5: Save to Firestore
+    # Step 6: Save to Firestore (needs every stage above)
     try:
-        diagnosis_id = create_diagnosis(
+        diagnosis_id = stages.run(
+            "firestore", create_diagnosis,
             user_id=cnn_output["userId"],
             crop=cnn_output["crop"],
             disease=cnn_output["predicted_disease"],
@@ -117,29 +248,44 @@ def run_pipeline(image_path: str, user_id: str, lat: float, lng: float) -> dict:
         print(f"Failed to save diagnosis: {e}")
         diagnosis_id = "local_diagnosis"
     
-    # Step 6: Get Nearby Agri Stores
-    try:
-        from .agri_store_service import get_nearby_agri_stores  # type: ignore
-        agri_stores = get_nearby_agri_stores(location, radius_km=10)
-    except Exception as e:
-        print(f"Failed to fetch agri stores: {e}")
-        agri_stores = []
-    
     # Final output
     final_output = {
         **cnn_output,
         "llm": llm_output,
         "location": location,
         "diagnosisId": diagnosis_id,
-        "nearbyAgriStores": agri_stores
+        "nearbyAgriStores": agri_stores,
+        "meta": {"timings": stages.timings()}
     }
     
     return final_output
 
 
+def run_pipeline(image, user_id: str, lat: float, lng: float, mime_type: str = None) -> dict:
+    """
+    Run full AI pipeline with location integration.
+    
+    Args:
+        image: Raw bytes of the plant image (a file path is also accepted)
+        user_id: User ID
+        lat: Latitude
+        lng: Longitude
+        mime_type: MIME type of the upload, forwarded to Gemini Vision
+    
+    Returns:
+        Complete diagnosis with location and nearby agri stores
+    """
+    # Geocoding and store lookup run while the image is classified
+    stages = _new_stages()
+    _start_location_stages(stages, lat, lng)
+
+    classification = stages.run("classify", classify_image, image, user_id, mime_type)
+    return enrich_diagnosis(classification, lat, lng, stages)
+
+
 if __name__ == "__main__":
     result = run_pipeline(
-        image_path=os.path.join(BASE_DIR, "test_image.JPG"),
+        image=os.path.join(BASE_DIR, "test_image.jpg"),
         user_id="9999999999",
         lat=12.9716,
         lng=77.5946
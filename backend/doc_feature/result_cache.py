@@ -0,0 +1,55 @@
+# result_cache.py
+"""
+Content-addressed cache of diagnosis results.
+Keyed by SHA-256 of the uploaded image bytes plus the model version,
+so a re-uploaded or retried photo skips CNN, Grad-CAM and the LLM call.
+"""
+
+import copy
+import hashlib
+import os
+
+from common.ttl_cache import TTLCache  # type: ignore
+from .model_registry import model_version, TF_AVAILABLE  # type: ignore
+
+RESULT_CACHE_TTL_S = float(os.getenv("DIAGNOSIS_CACHE_TTL_S", str(24 * 3600)))
+RESULT_CACHE_SIZE = int(os.getenv("DIAGNOSIS_CACHE_SIZE", "512"))
+# Optional SQLite file for the on-disk tier
+RESULT_CACHE_PATH = os.getenv("DIAGNOSIS_CACHE_PATH")
+
+_cache = TTLCache(
+    "diagnosis_results",
+    maxsize=RESULT_CACHE_SIZE,
+    ttl_s=RESULT_CACHE_TTL_S,
+    persist_path=RESULT_CACHE_PATH,
+)
+
+
+def cache_key(image_bytes) -> str:
+    """Content hash of the upload, scoped to the model that diagnoses it."""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    version = model_version() if TF_AVAILABLE else "gemini-vision"
+    return f"{version}:{digest}"
+
+
+def get_cached_result(key: str):
+    """
+    Returns (cnn_output, llm_output) or None.
+    Copies are returned so callers can attach per-request fields.
+    """
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    return copy.deepcopy(entry["cnn_output"]), copy.deepcopy(entry["llm_output"])
+
+
+def store_result(key: str, cnn_output: dict, llm_output: dict):
+    cnn_output = {k: v for k, v in cnn_output.items() if k != "userId"}
+    _cache.set(key, {
+        "cnn_output": copy.deepcopy(cnn_output),
+        "llm_output": copy.deepcopy(llm_output),
+    })
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,63 @@
+# test_batch_infer.py
+"""
+Test micro-batch formation under sustained load.
+Uses a fake model, so no TensorFlow or trained weights are needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from doc_feature import batch_infer  # noqa: E402
+
+
+class _SlowFakeModel:
+    """Stands in for a Keras model: fixed latency per predict call."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def predict(self, images, verbose=0):
+        time.sleep(self.latency_s)
+        return [None] * len(images)
+
+
+def test_batches_fill_under_load(monkeypatch):
+    """
+    32 clients x 10 submits against a 50 ms model. While a batch runs,
+    the next requests queue past their max-wait deadline; they must still
+    be batched together instead of going out one by one.
+    """
+    monkeypatch.setattr(batch_infer, "_interpret_predictions", lambda preds: {"ok": True})
+
+    engine = batch_infer.BatchInferenceEngine(_SlowFakeModel(0.05), max_batch_size=16, max_wait_ms=10)
+    image = np.zeros((4, 4, 3), dtype="float32")
+    errors = []
+
+    def client():
+        for _ in range(10):
+            try:
+                engine.submit(image, timeout=30)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=client) for _ in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.shutdown()
+
+    stats = engine.stats()
+    print(f"batches={stats['batches']} requests={stats['requests']} avg={stats['avg_batch_size']}")
+
+    assert not errors
+    assert stats["requests"] == 320
+    assert stats["avg_batch_size"] >= 8
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,107 @@
+# kvb/location/benchmark_geocoder.py
+"""
+Compare offline (local KD-tree) and remote (Google) reverse geocoding.
+
+Run from the backend directory:
+    python -m location.benchmark_geocoder [num_points]
+"""
+
+import random
+import sys
+import time
+
+from .offline_geocoder import get_offline_geocoder
+from .location_service import reverse_geocode, extract_location_components, GOOGLE_MAPS_KEY
+
+# Rough bounding box of India
+LAT_RANGE = (8.0, 32.0)
+LNG_RANGE = (69.0, 89.0)
+REMOTE_SAMPLE = 10  # Keep Maps spend small
+
+
+def _random_points(n: int) -> list:
+    rng = random.Random(42)
+    return [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(n)]
+
+
+def _percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def _report(name: str, timings_ms: list, resolved: int):
+    if not timings_ms:
+        print(f"{name:8s} skipped")
+        return
+    print(
+        f"{name:8s} n={len(timings_ms):5d}  resolved={resolved:5d}  "
+        f"mean={sum(timings_ms) / len(timings_ms):8.3f}ms  "
+        f"p50={_percentile(timings_ms, 0.5):8.3f}ms  "
+        f"p99={_percentile(timings_ms, 0.99):8.3f}ms"
+    )
+
+
+def benchmark_offline(points: list):
+    geocoder = get_offline_geocoder()
+    if not geocoder.available:
+        print(f"Offline dataset not found at {geocoder.data_path}")
+        return [], 0
+
+    timings, resolved = [], 0
+    for lat, lng in points:
+        started = time.perf_counter()
+        result = geocoder.reverse_lookup(lat, lng)
+        timings.append((time.perf_counter() - started) * 1000.0)
+        resolved += result is not None
+    return timings, resolved
+
+
+def benchmark_remote(points: list):
+    if not GOOGLE_MAPS_KEY:
+        print("GOOGLE_MAPS_API_KEY not set; remote path not measured")
+        return [], 0
+
+    timings, resolved = [], 0
+    for lat, lng in points[:REMOTE_SAMPLE]:
+        started = time.perf_counter()
+        try:
+            extract_location_components(reverse_geocode(lat, lng))
+            resolved += 1
+        except Exception as e:
+            print(f"   Remote lookup failed for {lat:.4f},{lng:.4f}: {e}")
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return timings, resolved
+
+
+def check_agreement(points: list):
+    """District agreement between the two resolvers on a small sample."""
+    geocoder = get_offline_geocoder()
+    if not geocoder.available or not GOOGLE_MAPS_KEY:
+        return
+
+    same, compared = 0, 0
+    for lat, lng in points[:REMOTE_SAMPLE]:
+        offline = geocoder.reverse_lookup(lat, lng)
+        if offline is None:
+            continue
+        try:
+            remote = extract_location_components(reverse_geocode(lat, lng))
+        except Exception:
+            continue
+        compared += 1
+        same += (offline["district"] or "").lower() == (remote["district"] or "").lower()
+    if compared:
+        print(f"District agreement: {same}/{compared}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    points = _random_points(n)
+
+    print("=" * 60)
+    print("BENCHMARK: Reverse geocoding (offline vs remote)")
+    print("=" * 60)
+
+    _report("offline", *benchmark_offline(points))
+    _report("remote", *benchmark_remote(points))
+    check_agreement(points)
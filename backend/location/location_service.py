@@ -1,6 +1,6 @@
 # kvb/location/location_service.py
+import math
 import os
-import requests
 try:
     import geohash as gh
 except ImportError:
@@ -10,6 +10,9 @@ except ImportError:
         gh = None
         print("Geohash library not available. Location services restricted.")
 from dotenv import load_dotenv
+from common.http_client import get_client
+from common.ttl_cache import TTLCache
+from .offline_geocoder import get_offline_geocoder
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +23,87 @@ GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 PLACE_URL = "https://maps.googleapis.com/maps/api/place/details/json"
 NEARBY_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
 
+# Pooled keep-alive client shared by all Maps calls
+_http = get_client("google_maps")
+
+# Per-attempt timeout for reverse geocoding. The client makes up to 3
+# attempts, and all of them must fit the pipeline's 12s location stage.
+GEOCODE_TIMEOUT_S = float(os.getenv("GEOCODE_TIMEOUT_S", "3.5"))
+
+# Reverse-geocode cache: points in the same geohash cell share one
+# state/district/village lookup (precision 6 ≈ 1.2km x 0.6km)
+GEOCODE_CACHE_PRECISION = int(os.getenv("GEOCODE_CACHE_PRECISION", "6"))
+_geocode_cache = TTLCache(
+    "reverse_geocode",
+    maxsize=int(os.getenv("GEOCODE_CACHE_SIZE", "10000")),
+    ttl_s=float(os.getenv("GEOCODE_CACHE_TTL_S", str(30 * 24 * 3600))),
+    persist_path=os.getenv("GEOCODE_CACHE_PATH"),
+)
+
+
+def encode_geohash(lat: float, lng: float, precision: int = 5):
+    """Geohash of a point, or None if the geohash library is missing."""
+    if not gh:
+        return None
+    return gh.encode(lat, lng, precision=precision)
+
+
+def geohash_cover(lat: float, lng: float, radius_km: float, precision: int = 4):
+    """
+    Geohash prefixes whose cells together cover a circle of radius_km.
+
+    Samples the circle's bounding box at half-cell spacing and collects
+    the cell of every sample, so the set includes the needed neighbours.
+    Returns None if the geohash library is missing.
+    """
+    if not gh:
+        return None
+
+    # Cell size in degrees at this precision (bits alternate lng/lat)
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    cell_lat = 180.0 / (1 << lat_bits)
+    cell_lng = 360.0 / (1 << lng_bits)
+
+    d_lat = radius_km / 111.0
+    d_lng = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+
+    lat_steps = int(math.ceil(2 * d_lat / (cell_lat / 2))) + 1
+    lng_steps = int(math.ceil(2 * d_lng / (cell_lng / 2))) + 1
+
+    cells = set()
+    for i in range(lat_steps):
+        p_lat = min(90.0, max(-90.0, lat - d_lat + 2 * d_lat * i / max(lat_steps - 1, 1)))
+        for j in range(lng_steps):
+            p_lng = lng - d_lng + 2 * d_lng * j / max(lng_steps - 1, 1)
+            p_lng = (p_lng + 180.0) % 360.0 - 180.0
+            cells.add(gh.encode(p_lat, p_lng, precision=precision))
+    return sorted(cells)
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_bounds(geohash: str):
+    """
+    Bounding box of a geohash cell as (lat_min, lat_max, lng_min, lng_max).
+    Pure Python, so it works without the geohash library.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True  # Bits alternate lng/lat, starting with lng
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
 
 def reverse_geocode(lat: float, lng: float) -> dict:
     """Call Google Geocoding API to get address components."""
@@ -43,7 +127,7 @@ def reverse_geocode(lat: float, lng: float) -> dict:
         "latlng": f"{lat},{lng}",
         "key": GOOGLE_MAPS_KEY
     }
-    res = requests.get(GEOCODE_URL, params=params, timeout=10)
+    res = _http.get(GEOCODE_URL, params=params, timeout=GEOCODE_TIMEOUT_S)
     res.raise_for_status()
     return res.json()
 
@@ -58,7 +142,7 @@ def place_details(place_id: str) -> dict:
         "fields": "name,geometry,address_component,rating,website",
         "key": GOOGLE_MAPS_KEY
     }
-    res = requests.get(PLACE_URL, params=params, timeout=10)
+    res = _http.get(PLACE_URL, params=params, timeout=10)
     res.raise_for_status()
     return res.json()
 
@@ -98,7 +182,7 @@ def nearby_search(lat: float, lng: float, radius_m: int, keyword: str, place_typ
         "keyword": keyword,
         "key": GOOGLE_MAPS_KEY
     }
-    res = requests.get(NEARBY_SEARCH_URL, params=params, timeout=10)
+    res = _http.get(NEARBY_SEARCH_URL, params=params, timeout=10)
     res.raise_for_status()
     return res.json()
 
@@ -140,6 +224,23 @@ def extract_location_components(geo_json: dict) -> dict:
     }
 
 
+def _geocode_components(lat: float, lng: float) -> dict:
+    """
+    Resolve state/district/village: local centroid index first,
+    then Google API.
+    """
+    offline = get_offline_geocoder().reverse_lookup(lat, lng)
+    if offline is not None:
+        return offline
+
+    # Retries on connection errors/5xx happen in the pooled client
+    return extract_location_components(reverse_geocode(lat, lng))
+
+
+def geocode_cache_stats() -> dict:
+    return _geocode_cache.stats()
+
+
 def normalize_location(lat: float, lng: float) -> dict:
     """
     Normalize location to standard format.
@@ -156,24 +257,15 @@ def normalize_location(lat: float, lng: float) -> dict:
     }
     """
     try:
-        # Reverse geocode using Google API with retry
-        max_retries = 2
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                geo_json = reverse_geocode(lat, lng)
-                break
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    print(f"Location API retry {attempt + 1}/{max_retries}")
-                    continue
-                else:
-                    raise e
+        cell = encode_geohash(lat, lng, GEOCODE_CACHE_PRECISION)
+        location = _geocode_cache.get(cell) if cell else None
         
-        # Extract components
-        location = extract_location_components(geo_json)
+        if location is None:
+            location = _geocode_components(lat, lng)
+            # Without a key a miss returns the mock geocode; don't keep it.
+            # Offline-index hits are cheap to redo.
+            if cell and GOOGLE_MAPS_KEY:
+                _geocode_cache.set(cell, location)
         
         # Generate geohash (precision 5 ≈ 4.9km x 4.9km)
         if gh:
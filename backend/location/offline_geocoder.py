@@ -0,0 +1,173 @@
+# kvb/location/offline_geocoder.py
+"""
+Offline reverse geocoder.
+Answers state/district/village lookups from a local table of
+administrative centroids, indexed in a 3-D KD-tree, with no network.
+
+Dataset: CSV with a header row and the columns
+    lat,lng,village,district,state
+(one row per village/town centroid, e.g. exported from Census or
+LGD village directories). Path comes from OFFLINE_GEOCODER_DATA,
+defaulting to location/data/admin_centroids.csv. Without the file the
+resolver is disabled and callers fall through to Google.
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATA_PATH = os.getenv(
+    "OFFLINE_GEOCODER_DATA",
+    os.path.join(BASE_DIR, "data", "admin_centroids.csv")
+)
+
+# Nearest centroid further than this is not trusted (falls back to remote)
+MAX_MATCH_DISTANCE_KM = float(os.getenv("OFFLINE_GEOCODER_MAX_KM", "15"))
+
+
+def _haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    R = 6371
+    d_lat = math.radians(lat2 - lat1)
+    d_lng = math.radians(lng2 - lng1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(d_lng / 2) ** 2)
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _to_xyz(lat: float, lng: float) -> tuple:
+    """Unit-sphere coordinates; chord length orders points like great-circle distance."""
+    lat_r = math.radians(lat)
+    lng_r = math.radians(lng)
+    cos_lat = math.cos(lat_r)
+    return (cos_lat * math.cos(lng_r), cos_lat * math.sin(lng_r), math.sin(lat_r))
+
+
+class _KDTree:
+    """Static 3-D KD-tree over unit-sphere points; nodes hold record indexes."""
+
+    def __init__(self, points: list):
+        # points: [(x, y, z, index)]
+        self._root = self._build(points, 0)
+
+    def _build(self, points: list, depth: int):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        return (
+            points[mid],
+            axis,
+            self._build(points[:mid], depth + 1),
+            self._build(points[mid + 1:], depth + 1),
+        )
+
+    def nearest(self, target: tuple):
+        best = [None, float("inf")]
+
+        def visit(node):
+            if node is None:
+                return
+            point, axis, left, right = node
+            d = ((point[0] - target[0]) ** 2 +
+                 (point[1] - target[1]) ** 2 +
+                 (point[2] - target[2]) ** 2)
+            if d < best[1]:
+                best[0], best[1] = point[3], d
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self._root)
+        return best[0]
+
+
+class OfflineGeocoder:
+    def __init__(self, data_path: str = DATA_PATH):
+        self.data_path = data_path
+        self._records = []
+        self._tree = None
+        self.load_time_s = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.data_path):
+            return
+
+        started = time.perf_counter()
+        points = []
+        try:
+            with open(self.data_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    try:
+                        lat = float(row["lat"])
+                        lng = float(row["lng"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    self._records.append({
+                        "lat": lat,
+                        "lng": lng,
+                        "village": row.get("village") or None,
+                        "district": row.get("district") or None,
+                        "state": row.get("state") or None,
+                    })
+                    points.append(_to_xyz(lat, lng) + (len(self._records) - 1,))
+        except Exception as e:
+            print(f"Offline geocoder data could not be loaded: {e}")
+            self._records = []
+            return
+
+        self._tree = _KDTree(points) if points else None
+        self.load_time_s = round(time.perf_counter() - started, 3)
+        print(f"Offline geocoder loaded {len(self._records)} centroids in {self.load_time_s}s")
+
+    @property
+    def available(self) -> bool:
+        return self._tree is not None
+
+    def __len__(self):
+        return len(self._records)
+
+    def reverse_lookup(self, lat: float, lng: float):
+        """
+        Nearest administrative centroid as {"state", "district", "village"},
+        or None when no centroid lies within MAX_MATCH_DISTANCE_KM.
+        """
+        if self._tree is None:
+            return None
+
+        idx = self._tree.nearest(_to_xyz(lat, lng))
+        if idx is None:
+            return None
+
+        record = self._records[idx]
+        if _haversine(lat, lng, record["lat"], record["lng"]) > MAX_MATCH_DISTANCE_KM:
+            return None
+
+        return {
+            "state": record["state"],
+            "district": record["district"],
+            "village": record["village"],
+        }
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_offline_geocoder() -> OfflineGeocoder:
+    """Shared instance, loaded on first use."""
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                _geocoder = OfflineGeocoder()
+    return _geocoder
@@ -0,0 +1,100 @@
+# kvb/prediction/alert_cache.py
+"""
+Cache of generate_alerts results per region.
+
+Keyed by (geohash cell, sorted crop set, weather snapshot id, district,
+village), so farmers in the same cell and area growing the same crops
+share one computation until the weather updates. Each key also carries
+generation numbers for the surrounding precision-4 cell and for the
+district and village, since cases there match at any distance.
+Recording a new disease case bumps the generation of every cell within
+the search radius of that case and of its district and village, which
+orphans the affected entries immediately.
+"""
+
+import copy
+import os
+import threading
+from typing import Optional
+
+from common.ttl_cache import TTLCache
+from location.location_service import encode_geohash, geohash_cover
+from prediction.evidence import NEARBY_CELL_PRECISION, NEARBY_RADIUS_KM
+
+ALERT_CACHE_TTL_S = float(os.getenv("ALERT_CACHE_TTL_S", "900"))
+ALERT_CACHE_SIZE = int(os.getenv("ALERT_CACHE_SIZE", "2048"))
+# Cells whose users share cached alerts (precision 5 ≈ 4.9km x 4.9km)
+ALERT_CELL_PRECISION = 5
+
+_alerts = TTLCache("prediction_alerts", maxsize=ALERT_CACHE_SIZE, ttl_s=ALERT_CACHE_TTL_S)
+
+_generations = {}
+_generations_lock = threading.Lock()
+_invalidations = 0
+
+
+def _weather_snapshot_id(weather: Optional[dict]) -> str:
+    if not weather:
+        return "none"
+    current = weather.get("current") or {}
+    return str(current.get("last_updated_epoch") or current.get("last_updated") or "static")
+
+
+def _area_keys(district: Optional[str], village: Optional[str]) -> list:
+    """Generation keys for administrative areas (matched case-insensitively)."""
+    keys = []
+    if district:
+        keys.append(f"d:{district.lower()}")
+    if village:
+        keys.append(f"v:{village.lower()}")
+    return keys
+
+
+def alert_cache_key(lat: float, lng: float, crops: list, weather: Optional[dict],
+                    district: Optional[str] = None, village: Optional[str] = None) -> Optional[str]:
+    """Cache key for an alert request, or None when geohash is unavailable."""
+    cell = encode_geohash(lat, lng, ALERT_CELL_PRECISION)
+    if cell is None:
+        return None
+    areas = _area_keys(district, village)
+    with _generations_lock:
+        generations = ".".join(str(_generations.get(scope, 0)) for scope in [cell[:NEARBY_CELL_PRECISION]] + areas)
+    crop_set = ",".join(sorted({c.lower() for c in crops}))
+    areas = "|".join(areas)
+    return f"{cell}|{crop_set}|{_weather_snapshot_id(weather)}|{areas}|g{generations}"
+
+
+def get_cached_alerts(key: Optional[str]) -> Optional[dict]:
+    if key is None:
+        return None
+    result = _alerts.get(key)
+    return copy.deepcopy(result) if result is not None else None
+
+
+def store_alerts(key: Optional[str], result: dict):
+    if key is not None:
+        _alerts.set(key, copy.deepcopy(result))
+
+
+def invalidate_near(lat: float, lng: float, radius_km: float = NEARBY_RADIUS_KM,
+                    district: Optional[str] = None, village: Optional[str] = None):
+    """
+    Expire cached alerts that a new case could change: every region within
+    radius_km of it (any user within radius_km lives in one of these
+    cells) and every entry for the case's district or village.
+    """
+    global _invalidations
+    scopes = (geohash_cover(lat, lng, radius_km, NEARBY_CELL_PRECISION) or []) + _area_keys(district, village)
+    if not scopes:
+        return
+    with _generations_lock:
+        for scope in scopes:
+            _generations[scope] = _generations.get(scope, 0) + 1
+        _invalidations += 1
+
+
+def alert_cache_stats() -> dict:
+    stats = _alerts.stats()
+    with _generations_lock:
+        stats["invalidations"] = _invalidations
+    return stats
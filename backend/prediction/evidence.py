@@ -0,0 +1,216 @@
+# kvb/prediction/evidence.py
+"""
+Nearby disease evidence.
+
+One query engine for "what has been reported near this point lately",
+shared by the prediction engine and the community signal service.
+Diagnoses and community posts are read concurrently, matched with the
+same distance/district/village rules, and streamed to the caller as
+they arrive.
+"""
+
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from db.firebase_init import db
+from location.location_service import geohash_cover
+
+# Firestore collection per evidence source
+SOURCES = {
+    "diagnosis": "diagnoses",
+    "community": "community",
+}
+
+# Exact-distance search radius used for alerts
+NEARBY_RADIUS_KM = 25
+
+# Geohash prefix length used to cover the search radius (≈39km x 19.5km
+# cells); stored location.geohash values are precision 5
+NEARBY_CELL_PRECISION = 4
+
+# Assumed distance for matches made on administrative area only
+DISTRICT_MATCH_KM = 5.0
+VILLAGE_MATCH_KM = 2.0
+
+# After an indexed query fails (usually a missing composite index, see
+# firestore.indexes.json), use the time-only scan for this long before
+# trying the indexed queries again
+INDEXED_QUERY_RETRY_S = float(os.getenv("EVIDENCE_INDEX_RETRY_S", "3600"))
+_indexed_disabled_until = {}  # collection -> time.monotonic() deadline
+
+_readers = ThreadPoolExecutor(
+    max_workers=int(os.getenv("EVIDENCE_READER_WORKERS", "8")),
+    thread_name_prefix="evidence",
+)
+_DONE = object()
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distance in km between two lat/lng points."""
+    R = 6371
+    d_lat = math.radians(lat2 - lat1)
+    d_lng = math.radians(lng2 - lng1)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(d_lng / 2) ** 2)
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def match_distance(
+    loc: dict,
+    lat: float,
+    lng: float,
+    radius_km: float,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+) -> Optional[float]:
+    """
+    Distance used for weighting if a location matches the search, else None.
+    Within radius_km → exact distance; otherwise same district or village
+    → an assumed short distance.
+    """
+    if "lat" in loc and "lng" in loc:
+        dist_km = haversine_km(lat, lng, loc["lat"], loc["lng"])
+        if dist_km <= radius_km:
+            return dist_km
+
+    if district and loc.get("district") and loc["district"].lower() == district.lower():
+        return DISTRICT_MATCH_KM
+    if village and loc.get("village") and loc["village"].lower() == village.lower():
+        return VILLAGE_MATCH_KM
+    return None
+
+
+def _candidate_docs(collection: str, lat: float, lng: float, radius_km: float,
+                    cutoff: datetime, district: Optional[str], village: Optional[str]):
+    """
+    Recent documents that may lie near (lat, lng), each once: a
+    createdAt-bounded range query per geohash prefix covering the radius,
+    plus district/village equality queries. Without the geohash library,
+    or if those queries failed recently (e.g. a composite index is
+    missing), this degrades to a time-only scan.
+    """
+    ref = db.collection(collection)
+    time_only = ref.where("createdAt", ">=", cutoff)
+    prefixes = geohash_cover(lat, lng, radius_km, NEARBY_CELL_PRECISION)
+    if prefixes is None or time.monotonic() < _indexed_disabled_until.get(collection, 0):
+        yield from time_only.stream()
+        return
+
+    queries = [
+        ref.where("location.geohash", ">=", prefix)
+           .where("location.geohash", "<", prefix + "~")
+           .where("createdAt", ">=", cutoff)
+        for prefix in prefixes
+    ]
+    if district:
+        queries.append(ref.where("location.district", "==", district).where("createdAt", ">=", cutoff))
+    if village:
+        queries.append(ref.where("location.village", "==", village).where("createdAt", ">=", cutoff))
+
+    seen = set()
+    try:
+        for query in queries:
+            for doc in query.stream():
+                if doc.id in seen:
+                    continue
+                seen.add(doc.id)
+                yield doc
+        return
+    except Exception as e:
+        _indexed_disabled_until[collection] = time.monotonic() + INDEXED_QUERY_RETRY_S
+        print(f"[Evidence] Indexed query on {collection} failed: {e}. "
+              f"Using time-only scans for {INDEXED_QUERY_RETRY_S:.0f}s.")
+
+    # Docs already yielded before the failure are skipped
+    for doc in time_only.stream():
+        if doc.id not in seen:
+            seen.add(doc.id)
+            yield doc
+
+
+def _read_source(source: str, out: "queue.Queue", stop: threading.Event, lat: float, lng: float,
+                 radius_km: float, cutoff: datetime, district: Optional[str], village: Optional[str]):
+    """Match one collection's candidates and push records onto `out`."""
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for doc in _candidate_docs(SOURCES[source], lat, lng, radius_km, cutoff, district, village):
+            data = doc.to_dict()
+            dist_km = match_distance(data.get("location") or {}, lat, lng, radius_km, district, village)
+            if dist_km is None:
+                continue
+
+            if "createdAt" in data and hasattr(data["createdAt"], "isoformat"):
+                data["createdAt"] = data["createdAt"].isoformat()
+            record = {
+                "source": source,
+                "id": doc.id,
+                "data": data,
+                "distance_km": round(dist_km, 2),
+            }
+            if not put(record):
+                return
+    except Exception as e:
+        print(f"[Evidence] Error reading {SOURCES[source]}: {e}")
+    finally:
+        put(_DONE)
+
+
+def iter_nearby_evidence(
+    lat: float,
+    lng: float,
+    radius_km: float,
+    days: int,
+    district: Optional[str] = None,
+    village: Optional[str] = None,
+    sources: tuple = ("diagnosis", "community"),
+) -> Iterator[dict]:
+    """
+    Stream recent documents near a point from the given sources.
+
+    Args:
+        lat, lng: Search centre
+        radius_km: Exact-distance radius
+        days: Look back period in days
+        district, village: Optional administrative-area fallback matches
+        sources: Keys of SOURCES to read (read concurrently)
+
+    Yields:
+        {"source", "id", "data", "distance_km"} in arrival order; "data" is
+        the document dict with createdAt converted to ISO format
+    """
+    if db is None or not sources:
+        return
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    out: "queue.Queue" = queue.Queue(maxsize=256)
+    stop = threading.Event()
+
+    for source in sources:
+        _readers.submit(_read_source, source, out, stop, lat, lng, radius_km, cutoff, district, village)
+
+    remaining = len(sources)
+    try:
+        while remaining:
+            item = out.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        # Consumer stopped early: let blocked readers exit
+        stop.set()
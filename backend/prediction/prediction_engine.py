@@ -15,24 +15,46 @@ Flow:
 import os
 import json
 import math
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from common.http_client import get_client
 from db.firebase_init import db
 from agri_calendar.weather_service import get_weather_forecast
+from db.disease_aggregate_service import aggregates_backfilled, query_buckets
+from location.location_service import geohash_cover
+from prediction.alert_cache import alert_cache_key, get_cached_alerts, store_alerts
+from prediction.evidence import (
+    iter_nearby_evidence, match_distance, INDEXED_QUERY_RETRY_S, NEARBY_CELL_PRECISION, NEARBY_RADIUS_KM,
+)
 
 # ── Gemini config (reuse from doc_feature) ────────────────────────────
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODELS = ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-1.5-flash"]
 API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+_http = get_client("gemini")
+
+# Risk summaries run on a shared pool: its size caps concurrent Gemini
+# calls across all requests; summaries not back by the deadline use the
+# local template
+LLM_SUMMARY_CONCURRENCY = int(os.getenv("LLM_SUMMARY_CONCURRENCY", "4"))
+LLM_SUMMARY_DEADLINE_S = float(os.getenv("LLM_SUMMARY_DEADLINE_S", "8"))
+_summary_pool = ThreadPoolExecutor(max_workers=LLM_SUMMARY_CONCURRENCY, thread_name_prefix="risk-summary")
 
 # ── Search parameters ─────────────────────────────────────────────────
-DEFAULT_RADIUS_KM = 25          # Lookup radius for nearby diagnoses
+DEFAULT_RADIUS_KM = NEARBY_RADIUS_KM  # Lookup radius for nearby diagnoses
 DEFAULT_LOOKBACK_DAYS = 30      # How far back to search
 MIN_CASES_FOR_ALERT = 1         # Minimum cases to trigger an alert
 HIGH_RISK_THRESHOLD = 0.65
 MEDIUM_RISK_THRESHOLD = 0.35
+# Read case counts from disease_aggregates instead of scanning raw documents,
+# once rebuild_aggregates has backfilled them
+USE_DISEASE_AGGREGATES = os.getenv("PREDICTION_USE_AGGREGATES", "true").lower() in ("1", "true", "yes")
+# Bucket queries need composite indexes; after a failure, scan raw
+# documents for INDEXED_QUERY_RETRY_S before trying again
+_aggregates_disabled_until = 0.0
 
 # ── Distance decay constant (epidemiology standard) ───────────────────
 # Weight = e^(-distance / DECAY_CONSTANT)
@@ -111,18 +133,6 @@ DISEASE_SEVERITY: Dict[str, float] = {
 }
 DEFAULT_SEVERITY = 0.5
 
-# ── Haversine ─────────────────────────────────────────────────────────
-def _haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Distance in km between two lat/lng points."""
-    R = 6371
-    d_lat = math.radians(lat2 - lat1)
-    d_lng = math.radians(lng2 - lng1)
-    a = (math.sin(d_lat / 2) ** 2 +
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-         math.sin(d_lng / 2) ** 2)
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-
 # ══════════════════════════════════════════════════════════════════════
 #  DISEASE  COMMUNICABILITY  KNOWLEDGE  BASE
 # ══════════════════════════════════════════════════════════════════════
@@ -372,126 +382,110 @@ def _get_user_crops(user_id: str) -> List[str]:
     return []
 
 
-def _get_recent_diagnoses(
+# ══════════════════════════════════════════════════════════════════════
+#  DISEASE  OCCURRENCES
+# ══════════════════════════════════════════════════════════════════════
+
+def _scan_disease_occurrences(
     district: Optional[str],
     village: Optional[str],
     lat: float,
     lng: float,
     radius_km: int = DEFAULT_RADIUS_KM,
     days: int = DEFAULT_LOOKBACK_DAYS,
-) -> List[dict]:
-    """
-    Fetch recent diagnosis records near the user's location.
-    Uses district/village matching first, then falls back to distance filtering.
-    Each result includes '_distance_km' for distance decay weighting.
-    """
-    if db is None:
-        return []
-
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    results: List[dict] = []
-
-    try:
-        query = db.collection("diagnoses").where("createdAt", ">=", cutoff)
-
-        for doc in query.stream():
-            data = doc.to_dict()
-            loc = data.get("location") or {}
-
-            # Skip healthy diagnoses
-            disease = data.get("disease", "")
-            if "healthy" in disease.lower():
-                continue
-
-            # Calculate distance (default to 0 for district/village matches)
-            dist_km = 0.0
-            matched = False
-
-            if "lat" in loc and "lng" in loc:
-                dist_km = _haversine(lat, lng, loc["lat"], loc["lng"])
-                if dist_km <= radius_km:
-                    matched = True
-            
-            # District/village match (use small default distance for weighting)
-            if not matched:
-                if district and loc.get("district") and loc["district"].lower() == district.lower():
-                    matched = True
-                    dist_km = 5.0  # Assume ~5km for same district match
-                elif village and loc.get("village") and loc["village"].lower() == village.lower():
-                    matched = True
-                    dist_km = 2.0  # Assume ~2km for same village match
-
-            if matched:
-                data["_doc_id"] = doc.id
-                data["_distance_km"] = round(dist_km, 2)
-                # Convert timestamps
-                if "createdAt" in data and hasattr(data["createdAt"], "isoformat"):
-                    data["createdAt"] = data["createdAt"].isoformat()
-                results.append(data)
-
-    except Exception as e:
-        print(f"[PredictionEngine] Error fetching diagnoses: {e}")
-
-    return results
-
+) -> Dict[str, List[dict]]:
+    """Build { disease_key: [records] } from raw diagnoses and community posts."""
+    disease_occurrences: Dict[str, List[dict]] = {}
 
-def _get_community_disease_posts(
+    for evidence in iter_nearby_evidence(lat, lng, radius_km, days, district, village):
+        data = evidence["data"]
+
+        if evidence["source"] == "diagnosis":
+            disease_key = data.get("disease", "")
+            if disease_key and "healthy" not in disease_key.lower():
+                disease_occurrences.setdefault(disease_key, []).append({
+                    "source": "diagnosis",
+                    "crop": data.get("crop", ""),
+                    "confidence": data.get("confidence", 0),
+                    "location": data.get("location", {}),
+                    "created_at": data.get("createdAt", ""),
+                    "distance_km": evidence["distance_km"],  # Include distance for decay
+                    "llm": data.get("llm", {}),
+                })
+        else:
+            # Only posts with analysis data
+            analysis = data.get("analysisData") or {}
+            disease_key = analysis.get("disease") or analysis.get("predicted_disease", "")
+            if disease_key and "healthy" not in disease_key.lower():
+                disease_occurrences.setdefault(disease_key, []).append({
+                    "source": "community",
+                    "crop": analysis.get("crop", ""),
+                    "confidence": analysis.get("confidence", 0),
+                    "location": data.get("location", {}),
+                    "created_at": data.get("createdAt", ""),
+                    "distance_km": evidence["distance_km"],  # Include distance for decay
+                })
+
+    return disease_occurrences
+
+
+def _aggregate_disease_occurrences(
     district: Optional[str],
     village: Optional[str],
     lat: float,
     lng: float,
     radius_km: int = DEFAULT_RADIUS_KM,
     days: int = DEFAULT_LOOKBACK_DAYS,
-) -> List[dict]:
-    """Fetch community posts that contain disease/analysis data.
-    Each result includes '_distance_km' for distance decay weighting.
+) -> Optional[Dict[str, List[dict]]]:
     """
-    if db is None:
-        return []
-
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    results: List[dict] = []
-
+    Build { disease_key: [records] } from the cell/day case buckets.
+    Each record stands for `count` cases at the bucket's case centroid.
+    Returns None when the buckets have not been backfilled yet or could
+    not be queried recently (caller falls back to scanning raw documents).
+    """
+    global _aggregates_disabled_until
+    if time.monotonic() < _aggregates_disabled_until:
+        return None
+    prefixes = geohash_cover(lat, lng, radius_km, NEARBY_CELL_PRECISION)
+    if prefixes is None or db is None or not aggregates_backfilled():
+        return None
+
+    since = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
     try:
-        query = db.collection("community").where("createdAt", ">=", cutoff)
-
-        for doc in query.stream():
-            data = doc.to_dict()
-            loc = data.get("location") or {}
+        buckets = query_buckets(prefixes, since, district, village)
+    except Exception as e:
+        _aggregates_disabled_until = time.monotonic() + INDEXED_QUERY_RETRY_S
+        print(f"[PredictionEngine] Error reading disease aggregates: {e}. "
+              f"Scanning raw documents for {INDEXED_QUERY_RETRY_S:.0f}s.")
+        return None
 
-            # Only posts with analysis data
-            if not data.get("analysisData"):
+    disease_occurrences: Dict[str, List[dict]] = {}
+    for bucket in buckets:
+        for disease_key, stats in (bucket.get("diseases") or {}).items():
+            count = int(stats.get("count", 0))
+            if count <= 0 or "healthy" in disease_key.lower():
                 continue
 
-            # Calculate distance
-            dist_km = 0.0
-            matched = False
-            
-            if "lat" in loc and "lng" in loc:
-                dist_km = _haversine(lat, lng, loc["lat"], loc["lng"])
-                if dist_km <= radius_km:
-                    matched = True
-            
-            # District/village match
-            if not matched:
-                if district and loc.get("district") and loc["district"].lower() == district.lower():
-                    matched = True
-                    dist_km = 5.0
-                elif village and loc.get("village") and loc["village"].lower() == village.lower():
-                    matched = True
-                    dist_km = 2.0
-
-            if matched:
-                data["_doc_id"] = doc.id
-                data["_distance_km"] = round(dist_km, 2)
-                if "createdAt" in data and hasattr(data["createdAt"], "isoformat"):
-                    data["createdAt"] = data["createdAt"].isoformat()
-                results.append(data)
+            centroid = {
+                "lat": stats["lat_sum"] / count,
+                "lng": stats["lng_sum"] / count,
+                "district": bucket.get("district"),
+                "village": bucket.get("village"),
+            }
+            dist_km = match_distance(centroid, lat, lng, radius_km, district, village)
+            if dist_km is None:
+                continue
 
-    except Exception as e:
-        print(f"[PredictionEngine] Error fetching community posts: {e}")
+            crops = stats.get("crops") or [""]
+            disease_occurrences.setdefault(disease_key, []).append({
+                "source": "aggregate",
+                "count": count,
+                "crop": crops[0],
+                "created_at": bucket.get("date", ""),
+                "distance_km": round(dist_km, 2),
+            })
 
-    return results
+    return disease_occurrences
 
 
 # ══════════════════════════════════════════════════════════════════════
@@ -587,7 +581,8 @@ def _assess_weather_risk(weather: dict, disease_key: str) -> dict:
 def _generate_llm_risk_summary(alert_data: dict) -> Optional[str]:
     """
     Use Gemini to generate a concise, farmer-friendly risk summary.
-    Falls back to a template if LLM is unavailable.
+    Falls back to a template if no API key is set; returns None if
+    every model fails.
     """
     if not GEMINI_API_KEY:
         return _generate_local_risk_summary(alert_data)
@@ -615,7 +610,7 @@ Return ONLY the summary text, no JSON, no markdown.
     for model in GEMINI_MODELS:
         url = f"{API_BASE}/{model}:generateContent?key={GEMINI_API_KEY}"
         try:
-            resp = requests.post(
+            resp = _http.post(
                 url,
                 headers={"Content-Type": "application/json"},
                 data=json.dumps(payload),
@@ -630,7 +625,7 @@ Return ONLY the summary text, no JSON, no markdown.
             print(f"[PredictionEngine] LLM risk summary failed ({model}): {e}")
             continue
 
-    return _generate_local_risk_summary(alert_data)
+    return None
 
 
 def _generate_local_risk_summary(alert_data: dict) -> str:
@@ -670,6 +665,51 @@ def _generate_local_risk_summary(alert_data: dict) -> str:
     return summary
 
 
+def _attach_risk_summaries(alerts: List[dict]) -> bool:
+    """
+    Set "ai_summary" on every alert. LLM summaries are generated
+    concurrently; any that fail or miss LLM_SUMMARY_DEADLINE_S fall back
+    to _generate_local_risk_summary.
+
+    Returns:
+        False if any summary fell back because Gemini failed or was late
+    """
+    if not alerts:
+        return True
+
+    if not GEMINI_API_KEY:
+        for alert_data in alerts:
+            alert_data["ai_summary"] = _generate_local_risk_summary(alert_data)
+        return True
+
+    futures = [_summary_pool.submit(_generate_llm_risk_summary, alert_data) for alert_data in alerts]
+    wait(futures, timeout=LLM_SUMMARY_DEADLINE_S)
+
+    late = 0
+    failed = 0
+    for alert_data, future in zip(alerts, futures):
+        if not future.done():
+            # Drop queued work; calls already in flight finish in the background
+            future.cancel()
+            late += 1
+            alert_data["ai_summary"] = _generate_local_risk_summary(alert_data)
+            continue
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"[PredictionEngine] LLM summary skipped: {e}")
+            summary = None
+        if summary is None:
+            failed += 1
+            summary = _generate_local_risk_summary(alert_data)
+        alert_data["ai_summary"] = summary
+
+    if late:
+        print(f"[PredictionEngine] {late}/{len(alerts)} LLM summaries missed the "
+              f"{LLM_SUMMARY_DEADLINE_S}s deadline. Using local summaries.")
+    return not (late or failed)
+
+
 # ══════════════════════════════════════════════════════════════════════
 #  MAIN  ENGINE  —  generate_alerts()
 # ══════════════════════════════════════════════════════════════════════
@@ -720,42 +760,20 @@ def generate_alerts(
     # 2. Fetch weather
     weather = get_weather_forecast(lat, lng, days=3)
 
-    # 3. Fetch nearby diagnoses
-    diagnoses = _get_recent_diagnoses(district, village, lat, lng)
-
-    # 4. Fetch community posts with disease data
-    community_posts = _get_community_disease_posts(district, village, lat, lng)
-
-    # 5. Build disease occurrence map: { disease_key: [records] }
-    disease_occurrences: Dict[str, List[dict]] = {}
-
-    for diag in diagnoses:
-        disease_key = diag.get("disease", "")
-        if disease_key and "healthy" not in disease_key.lower():
-            disease_occurrences.setdefault(disease_key, []).append({
-                "source": "diagnosis",
-                "crop": diag.get("crop", ""),
-                "confidence": diag.get("confidence", 0),
-                "location": diag.get("location", {}),
-                "created_at": diag.get("createdAt", ""),
-                "distance_km": diag.get("_distance_km", 10.0),  # Include distance for decay
-                "llm": diag.get("llm", {}),
-            })
+    # Same cell, crops and weather snapshot → reuse the last computation
+    cache_key = alert_cache_key(lat, lng, crops_normalized, weather, district, village)
+    cached = get_cached_alerts(cache_key)
+    if cached is not None:
+        return cached
 
-    for post in community_posts:
-        analysis = post.get("analysisData", {})
-        disease_key = analysis.get("disease") or analysis.get("predicted_disease", "")
-        if disease_key and "healthy" not in disease_key.lower():
-            disease_occurrences.setdefault(disease_key, []).append({
-                "source": "community",
-                "crop": analysis.get("crop", ""),
-                "confidence": analysis.get("confidence", 0),
-                "location": post.get("location", {}),
-                "created_at": post.get("createdAt", ""),
-                "distance_km": post.get("_distance_km", 10.0),  # Include distance for decay
-            })
+    # 3. Nearby disease occurrences: { disease_key: [records] }
+    disease_occurrences = None
+    if USE_DISEASE_AGGREGATES:
+        disease_occurrences = _aggregate_disease_occurrences(district, village, lat, lng)
+    if disease_occurrences is None:
+        disease_occurrences = _scan_disease_occurrences(district, village, lat, lng)
 
-    # 6. Generate alerts for each user crop
+    # 4. Generate alerts for each user crop
     alerts: List[dict] = []
 
     for crop in crops_normalized:
@@ -788,7 +806,7 @@ def generate_alerts(
                 continue
 
             # This disease is relevant to this user crop
-            case_count = len(occurrences)
+            case_count = sum(occ.get("count", 1) for occ in occurrences)
             if case_count < MIN_CASES_FOR_ALERT:
                 continue
 
@@ -805,9 +823,9 @@ def generate_alerts(
             for occ in occurrences:
                 dist = occ.get("distance_km", 10.0)
                 min_distance = min(min_distance, dist)
-                # Exponential decay: e^(-d/10)
+                # Exponential decay: e^(-d/10), per case in the record
                 weight = math.exp(-dist / DISTANCE_DECAY_CONSTANT)
-                weighted_case_score += weight
+                weighted_case_score += weight * occ.get("count", 1)
             
             # Normalize weighted score to 0.3-0.7 range
             # 1 case at 0km = weight 1.0 → base 0.4
@@ -878,16 +896,11 @@ def generate_alerts(
                 "organic_treatments": disease_info.get("organic", []),
             }
 
-            # LLM summary (best-effort, non-blocking)
-            try:
-                llm_summary = _generate_llm_risk_summary(alert_data)
-                alert_data["ai_summary"] = llm_summary
-            except Exception as e:
-                print(f"[PredictionEngine] LLM summary skipped: {e}")
-                alert_data["ai_summary"] = _generate_local_risk_summary(alert_data)
-
             alerts.append(alert_data)
 
+    # 5. Summaries for all alerts at once (best-effort, bounded by deadline)
+    summaries_complete = _attach_risk_summaries(alerts)
+
     # Sort by risk score (highest first)
     alerts.sort(key=lambda a: a["risk_score"], reverse=True)
 
@@ -909,7 +922,7 @@ def generate_alerts(
             "location_name": location_info.get("name"),
         }
 
-    return {
+    result = {
         "alerts": alerts,
         "summary": {
             "total_alerts": len(alerts),
@@ -921,3 +934,7 @@ def generate_alerts(
         "crops_monitored": crops_normalized,
         "generated_at": datetime.utcnow().isoformat(),
     }
+    # Template fallbacks are not cached so Gemini is retried for this region
+    if summaries_complete:
+        store_alerts(cache_key, result)
+    return result